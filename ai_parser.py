@@ -165,6 +165,19 @@ def _transcribe_faster_whisper(file_path: str) -> Tuple[str, float, float]:
     return transcript, confidence, clip_duration
 
 
+def warmup() -> None:
+    """Preload the configured transcription model so the first transcribe call skips the load."""
+    if QA_MODE:
+        return
+    loader = {"vosk": _load_vosk_model, "faster_whisper": _load_faster_whisper}.get(TRANSCRIBE_ENGINE)
+    if loader is None:
+        return
+    try:
+        loader()
+    except RuntimeError as exc:
+        LOGGER.warning("Transcription warmup skipped (%s): %s", TRANSCRIBE_ENGINE, exc)
+
+
 def transcribe_audio(file_path: str) -> Tuple[str, float, float]:
     """Transcribe audio file and return (text, confidence, duration_seconds)."""
     if QA_MODE:
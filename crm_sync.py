@@ -22,6 +22,8 @@ from typing import Any, Dict, Iterable, List, MutableMapping, Optional, Tuple
 import requests
 import streamlit as st
 
+import fieldos_json
+
 SNAPSHOT_PATH = Path("data/crm_snapshot.json")
 WORKER_NAME = "crm-sync-worker"
 OPS_LOG_PATH = Path("data/ops_log.jsonl")
@@ -30,6 +32,11 @@ CRM_SAMPLE_PATH = Path("data/crm_sample.csv")
 
 LOGGER = logging.getLogger(__name__)
 
+# Payloads the worker thread has processed. Waiters compare against a count they saw
+# earlier instead of clearing shared state, so any number of them can watch at once.
+_PAYLOADS_PROCESSED = 0
+_PAYLOAD_PROGRESS = threading.Condition()
+
 DEFAULT_CRM_ENDPOINT = "http://localhost:8787/crm/push"
 DEFAULT_CRM_TIMEOUT = 5.0
 DEFAULT_CRM_MAX_RETRIES = 3
@@ -273,11 +280,11 @@ def load_snapshot() -> Dict:
     """Load or seed the snapshot; migrate missing keys safely."""
     if not SNAPSHOT_PATH.exists():
         SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
-        SNAPSHOT_PATH.write_text(json.dumps(BASE_SNAPSHOT, indent=2))
+        SNAPSHOT_PATH.write_bytes(fieldos_json.dump_snapshot(BASE_SNAPSHOT))
     try:
-        raw = SNAPSHOT_PATH.read_text()
-        snap = json.loads(raw) if raw.strip() else {}
-    except (json.JSONDecodeError, OSError):
+        raw = SNAPSHOT_PATH.read_bytes()
+        snap = fieldos_json.loads(raw) if raw.strip() else {}
+    except (ValueError, OSError):
         # File was truncated or corrupted mid-write; fall back to a fresh snapshot.
         snap = {}
     for key, value in BASE_SNAPSHOT.items():
@@ -286,7 +293,7 @@ def load_snapshot() -> Dict:
         elif isinstance(value, dict) and isinstance(snap[key], dict):
             for nested_key, nested_value in value.items():
                 snap[key].setdefault(nested_key, nested_value)
-    SNAPSHOT_PATH.write_text(json.dumps(snap, indent=2))
+    SNAPSHOT_PATH.write_bytes(fieldos_json.dump_snapshot(snap))
     return snap
 
 
@@ -299,7 +306,7 @@ def save_snapshot(update: Dict | None = None) -> None:
             else:
                 snap[key] = value
     snap["last_sync"] = datetime.now().isoformat()
-    SNAPSHOT_PATH.write_text(json.dumps(snap, indent=2))
+    SNAPSHOT_PATH.write_bytes(fieldos_json.dump_snapshot(snap))
 
 
 def enqueue_crm_push(payload: Dict) -> None:
@@ -622,6 +629,26 @@ def _process_payload(payload: Dict, offline: bool) -> None:
     _cache_payload(session, payload_copy, result=result, state_label="failed")
 
 
+def _mark_payload_processed() -> None:
+    global _PAYLOADS_PROCESSED
+    with _PAYLOAD_PROGRESS:
+        _PAYLOADS_PROCESSED += 1
+        _PAYLOAD_PROGRESS.notify_all()
+
+
+def payloads_processed() -> int:
+    """Return how many payloads the worker thread has processed so far."""
+    with _PAYLOAD_PROGRESS:
+        return _PAYLOADS_PROCESSED
+
+
+def wait_for_payloads(seen: int, timeout: float) -> int:
+    """Block until the worker has processed more than ``seen`` payloads or ``timeout`` passes; return the count."""
+    with _PAYLOAD_PROGRESS:
+        _PAYLOAD_PROGRESS.wait_for(lambda: _PAYLOADS_PROCESSED > seen, timeout)
+        return _PAYLOADS_PROCESSED
+
+
 def _worker_loop() -> None:
     while True:
         _ensure_session_lists()
@@ -629,6 +656,7 @@ def _worker_loop() -> None:
             payload = st.session_state["crm_queue"].pop(0)
             time.sleep(0.35)
             _process_payload(payload, st.session_state.get("offline", False))
+            _mark_payload_processed()
         else:
             time.sleep(0.2)
 
@@ -0,0 +1,38 @@
+"""JSON helpers that use orjson when it is installed and fall back to the stdlib.
+
+Both backends read bytes directly and raise a ``ValueError`` subclass on bad input,
+so callers catch ``ValueError`` whichever one is active.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+loads = orjson.loads if orjson is not None else json.loads
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value).encode("utf-8")
+
+
+def dumps_line(value: Any) -> bytes:
+    """Compact UTF-8 JSON followed by a newline, for JSONL files."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(value) + "\n").encode("utf-8")
+
+
+def dump_snapshot(snapshot: Any) -> bytes:
+    """Two-space indented UTF-8 JSON, the layout of ``data/crm_snapshot.json``."""
+    if orjson is not None:
+        return orjson.dumps(snapshot, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(snapshot, indent=2).encode("utf-8")
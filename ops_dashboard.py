@@ -6,35 +6,128 @@ Launch with:
 
 from __future__ import annotations
 
-import json
+import mmap
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from statistics import mean
+from typing import Deque, Iterable, Iterator, Optional
 
 import streamlit as st
 
+import fieldos_json
+
 OPS_LOG_PATH = Path("data/ops_log.jsonl")
 QUEUE_WARN_THRESHOLD = 3
+# Upper bound on rows kept for the table/trend chart so huge logs stay in bounded memory.
+MAX_TABLE_ROWS = 10_000
 
 
-@st.cache_data(show_spinner=False)
-def load_ops_entries() -> list[dict]:
-    if not OPS_LOG_PATH.exists():
-        return []
-    entries: list[dict] = []
-    for line in OPS_LOG_PATH.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
+def _iter_view(view: mmap.mmap, start: int, end: int) -> Iterator[dict]:
+    while start < end:
+        newline = view.find(b"\n", start, end)
+        if newline == -1:
+            newline = end
+        line = view[start:newline].strip()
+        start = newline + 1
         if not line:
             continue
         try:
-            entries.append(json.loads(line))
-        except json.JSONDecodeError:
+            yield fieldos_json.loads(line)
+        except ValueError:
             continue
-    return entries
 
 
-def _avg(values: list[float]) -> str:
-    return f"{mean(values):.1f}" if values else "—"
+def iter_ops_entries() -> Iterator[dict]:
+    """Yield ops log entries one at a time, skipping blank or malformed lines."""
+    if not OPS_LOG_PATH.exists() or OPS_LOG_PATH.stat().st_size == 0:
+        return
+    with OPS_LOG_PATH.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        yield from _iter_view(view, 0, len(view))
+
+
+@dataclass
+class OpsSummary:
+    """Running aggregates over the ops log, built in a single streaming pass."""
+
+    entries: int = 0
+    latency_total: float = 0.0
+    latency_count: int = 0
+    updates_total: float = 0.0
+    updates_count: int = 0
+    total_dropouts: int = 0
+    total_success: int = 0
+    crm_entries: int = 0
+    crm_success: int = 0
+    crm_errors: int = 0
+    latest: dict = field(default_factory=dict)
+    latest_crm_error: Optional[str] = None
+    queue_recent: Deque[int] = field(default_factory=lambda: deque(maxlen=5))
+    queue_depths: Deque[int] = field(default_factory=lambda: deque(maxlen=MAX_TABLE_ROWS))
+    recent_entries: Deque[dict] = field(default_factory=lambda: deque(maxlen=MAX_TABLE_ROWS))
+    # Byte offset just past the last complete line folded into the aggregates.
+    offset: int = 0
+
+
+def summarize_ops(entries: Iterable[dict], summary: Optional[OpsSummary] = None) -> OpsSummary:
+    if summary is None:
+        summary = OpsSummary()
+    for entry in entries:
+        summary.entries += 1
+        latency = entry.get("stream_latency_ms_first_partial")
+        if latency is not None:
+            summary.latency_total += latency
+            summary.latency_count += 1
+        updates = entry.get("stream_updates")
+        if isinstance(updates, (int, float)):
+            summary.updates_total += updates
+            summary.updates_count += 1
+        summary.total_dropouts += int(entry.get("stream_dropouts") or 0)
+        if not entry.get("final_worker_error"):
+            summary.total_success += 1
+        crm_error = entry.get("crm_error")
+        if entry.get("crm_response_code") is not None:
+            summary.crm_entries += 1
+            if not crm_error and entry.get("status") == "synced":
+                summary.crm_success += 1
+        if crm_error:
+            summary.crm_errors += 1
+            summary.latest_crm_error = crm_error
+        queue_depth = int(entry.get("final_worker_queue_depth") or 0)
+        summary.queue_recent.append(queue_depth)
+        summary.queue_depths.append(queue_depth)
+        summary.recent_entries.append(entry)
+        summary.latest = entry
+    return summary
+
+
+def refresh_ops_summary(summary: OpsSummary) -> OpsSummary:
+    """Fold lines appended since ``summary.offset`` into ``summary``.
+
+    Only newline-terminated lines are consumed, so a line still being written is
+    picked up on the next refresh. A log that shrank (rotated or truncated) is
+    re-read from the start.
+    """
+    if not OPS_LOG_PATH.exists() or OPS_LOG_PATH.stat().st_size == 0:
+        return OpsSummary()
+    with OPS_LOG_PATH.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        if len(view) < summary.offset:
+            summary = OpsSummary()
+        end = view.rfind(b"\n", summary.offset) + 1
+        if end > summary.offset:
+            summarize_ops(_iter_view(view, summary.offset, end), summary)
+            summary.offset = end
+    return summary
+
+
+def load_ops_summary() -> OpsSummary:
+    summary = refresh_ops_summary(st.session_state.get("_ops_summary") or OpsSummary())
+    st.session_state["_ops_summary"] = summary
+    return summary
+
+
+def _avg(total: float, count: int) -> str:
+    return f"{total / count:.1f}" if count else "—"
 
 
 def _parse_ts(value: str | None) -> datetime | None:
@@ -54,32 +147,22 @@ def main() -> None:
     st.set_page_config(page_title="FieldOS Ops Dashboard", layout="wide")
     st.title("FieldOS Ops Dashboard")
 
-    entries = load_ops_entries()
-    if not entries:
+    summary = load_ops_summary()
+    if not summary.entries:
         st.warning("No ops log entries found at data/ops_log.jsonl")
         return
 
-    latest = entries[-1]
-    latency_values = [
-        e["stream_latency_ms_first_partial"] for e in entries if e.get("stream_latency_ms_first_partial") is not None
-    ]
-    updates_values = [e.get("stream_updates") for e in entries if isinstance(e.get("stream_updates"), (int, float))]
-    total_dropouts = sum(int(e.get("stream_dropouts") or 0) for e in entries)
-    total_success = sum(1 for e in entries if not e.get("final_worker_error"))
-    success_rate = (total_success / len(entries)) * 100 if entries else 0.0
-    crm_entries = [e for e in entries if e.get("crm_response_code") is not None]
-    crm_success_count = sum(1 for e in crm_entries if not e.get("crm_error") and (e.get("status") == "synced"))
-    crm_success_rate = (crm_success_count / len(crm_entries)) * 100 if crm_entries else 0.0
-    latest_crm_error_entry = next((e for e in reversed(entries) if e.get("crm_error")), None)
-    latest_crm_error = latest_crm_error_entry.get("crm_error") if latest_crm_error_entry else None
+    latest = summary.latest
+    success_rate = (summary.total_success / summary.entries) * 100
+    crm_success_rate = (summary.crm_success / summary.crm_entries) * 100 if summary.crm_entries else 0.0
+    latest_crm_error = summary.latest_crm_error
     latest_crm_code = latest.get("crm_response_code")
     latest_queue = int(latest.get("final_worker_queue_depth") or 0)
     latest_error = latest.get("final_worker_error")
     latest_success = latest.get("final_worker_last_success")
     success_dt = _parse_ts(latest_success)
     success_display = success_dt.astimezone().strftime("%Y-%m-%d %H:%M:%S %Z") if success_dt else "—"
-    queue_depths = [int(e.get("final_worker_queue_depth") or 0) for e in entries]
-    queue_recent = queue_depths[-5:]
+    queue_recent = list(summary.queue_recent)
     queue_trend_delta = queue_recent[-1] - queue_recent[0] if len(queue_recent) >= 2 else 0
 
     latest_chat_requests = int(latest.get("chat_requests") or 0)
@@ -90,10 +173,10 @@ def main() -> None:
     latest_chat_positioning = int(latest.get("chat_positioning_count") or 0)
 
     col1, col2, col3, col4, col5, col6, col7 = st.columns(7)
-    col1.metric("Entries", len(entries))
-    col2.metric("Avg First Partial (ms)", _avg(latency_values))
-    col3.metric("Avg Updates", _avg(updates_values))
-    col4.metric("Total Dropouts", total_dropouts)
+    col1.metric("Entries", summary.entries)
+    col2.metric("Avg First Partial (ms)", _avg(summary.latency_total, summary.latency_count))
+    col3.metric("Avg Updates", _avg(summary.updates_total, summary.updates_count))
+    col4.metric("Total Dropouts", summary.total_dropouts)
     col5.metric("AI Failures (latest)", latest.get("ai_failures", 0))
     delta = "⚠️ backlog" if latest_queue > QUEUE_WARN_THRESHOLD else None
     col6.metric("Final Worker Queue", latest_queue, delta=delta)
@@ -103,7 +186,7 @@ def main() -> None:
     crm_col1, crm_col2, crm_col3 = st.columns(3)
     crm_col1.metric("CRM Success Rate", f"{crm_success_rate:.1f}%")
     crm_col2.metric("Latest CRM Code", latest_crm_code or "—")
-    crm_col3.metric("CRM Errors Logged", sum(1 for e in entries if e.get("crm_error")))
+    crm_col3.metric("CRM Errors Logged", summary.crm_errors)
 
     chat_col1, chat_col2, chat_col3, chat_col4 = st.columns(4)
     chat_col1.metric("Copilot Requests", latest_chat_requests)
@@ -123,10 +206,12 @@ def main() -> None:
         st.caption(f"Queue trend (last {len(queue_recent)} entries): {queue_trend_delta:+d}")
 
     st.subheader("Final Worker Queue Depth Trend")
-    st.line_chart(queue_depths)
+    st.line_chart(list(summary.queue_depths))
 
     st.subheader("Ops Log Entries")
-    st.dataframe(entries)
+    if summary.entries > MAX_TABLE_ROWS:
+        st.caption(f"Showing the latest {MAX_TABLE_ROWS:,} of {summary.entries:,} entries.")
+    st.dataframe(list(summary.recent_entries))
 
 
 if __name__ == "__main__":
@@ -19,6 +19,17 @@ from typing import Dict, List, Optional
 
 import streamlit as st
 
+# Idle workers block on the job queue until the next heartbeat is due instead
+# of waking every 0.5s; keep this well under the 5s staleness warning in main().
+HEARTBEAT_INTERVAL_S = 2.0
+
+# Worker messages are positional tuples tagged by their first element, which
+# pickle far smaller than string-keyed dicts on every queue hop:
+#   ("log", msg) | ("heartbeat", pid, ts) | ("shutdown", pid, ts)
+#   ("result", *RESULT_FIELDS)
+RESULT_FIELDS = ("job_id", "payload", "transcript", "confidence", "duration_ms", "pid")
+
+
 @dataclass
 class WorkerState:
     process: mp.Process
@@ -32,18 +43,23 @@ class WorkerState:
 def _worker_main(job_q: mp.Queue, result_q: mp.Queue) -> None:
     """Background worker loop; simulates transcription latency."""
     pid = os.getpid()
-    result_q.put({"type": "log", "msg": f"Worker started (PID={pid})"})
+    result_q.put(("log", f"Worker started (PID={pid})"))
     running = True
+    next_heartbeat = time.monotonic() + HEARTBEAT_INTERVAL_S
     while running:
         try:
-            job = job_q.get(timeout=0.5)
+            job = job_q.get(timeout=max(0.0, next_heartbeat - time.monotonic()))
         except queue.Empty:
-            result_q.put({"type": "heartbeat", "pid": pid, "ts": time.time()})
+            job = None
+        if time.monotonic() >= next_heartbeat:
+            result_q.put(("heartbeat", pid, time.time()))
+            next_heartbeat = time.monotonic() + HEARTBEAT_INTERVAL_S
+        if job is None:
             continue
 
         if job == "STOP":
             running = False
-            result_q.put({"type": "log", "msg": f"Worker stopping (PID={pid})"})
+            result_q.put(("log", f"Worker stopping (PID={pid})"))
             break
 
         job_id, payload = job
@@ -51,18 +67,8 @@ def _worker_main(job_q: mp.Queue, result_q: mp.Queue) -> None:
         # Simulate transcription latency
         time.sleep(0.35)
         duration_ms = round((time.perf_counter() - start) * 1000, 1)
-        result_q.put(
-            {
-                "type": "result",
-                "job_id": job_id,
-                "payload": payload,
-                "transcript": payload.upper(),
-                "confidence": 0.87,
-                "duration_ms": duration_ms,
-                "pid": pid,
-            }
-        )
-    result_q.put({"type": "shutdown", "pid": pid, "ts": time.time()})
+        result_q.put(("result", job_id, payload, payload.upper(), 0.87, duration_ms, pid))
+    result_q.put(("shutdown", pid, time.time()))
 
 
 def _cleanup_worker_resources(worker: Optional["WorkerState"]) -> None:
@@ -96,6 +102,7 @@ def _get_or_start_worker() -> WorkerState:
         _cleanup_worker_resources(state)
         st.session_state.pop("_final_worker_state", None)
         st.session_state.pop("final_worker_jobs", None)
+        st.session_state.pop("_final_worker_counts", None)
         st.session_state.pop("final_worker_results", None)
         st.session_state.pop("final_worker_logs", None)
         manager = st.session_state.pop("_final_worker_manager", None)
@@ -115,49 +122,62 @@ def _get_or_start_worker() -> WorkerState:
     proc = ctx.Process(target=_worker_main, args=(job_q, result_q), daemon=True)
     proc.start()
     worker_state = WorkerState(process=proc, pid=proc.pid, job_queue=job_q, result_queue=result_q)
-    st.session_state["_final_worker_state"] = worker_state
-    st.session_state.setdefault("final_worker_jobs", {})
-    st.session_state.setdefault("final_worker_results", [])
-    st.session_state.setdefault("final_worker_logs", [])
+    session = st.session_state
+    session.update(
+        {
+            "_final_worker_state": worker_state,
+            "final_worker_jobs": session.get("final_worker_jobs", {}),
+            "_final_worker_counts": session.get("_final_worker_counts", {"queued": 0, "completed": 0}),
+            "final_worker_results": session.get("final_worker_results", []),
+            "final_worker_logs": session.get("final_worker_logs", []),
+        }
+    )
     return worker_state
 
 
 def _enqueue_job(worker: WorkerState, text: str) -> str:
     job_id = uuid.uuid4().hex[:8]
     worker.job_queue.put((job_id, text))
-    st.session_state["final_worker_jobs"][job_id] = {
+    session = st.session_state
+    session["final_worker_jobs"][job_id] = {
         "text": text,
         "submitted_at": time.time(),
         "status": "queued",
     }
+    session["_final_worker_counts"]["queued"] += 1
     return job_id
 
 
 def _drain_results(worker: WorkerState) -> None:
-    job_states: Dict[str, Dict] = st.session_state["final_worker_jobs"]
-    results: List[Dict] = st.session_state["final_worker_results"]
-    logs: List[str] = st.session_state["final_worker_logs"]
+    session = st.session_state
+    job_states: Dict[str, Dict] = session["final_worker_jobs"]
+    counts: Dict[str, int] = session["_final_worker_counts"]
+    results: List[Dict] = session["final_worker_results"]
+    logs: List[str] = session["final_worker_logs"]
 
     while True:
         try:
             message = worker.result_queue.get_nowait()
         except queue.Empty:
             break
-
-        mtype = message.get("type")
+        mtype = message[0]
         if mtype == "result":
-            job_id = message["job_id"]
-            results.append(message)
-            if job_id in job_states:
-                job_states[job_id]["status"] = "completed"
-                job_states[job_id]["completed_at"] = time.time()
-                job_states[job_id]["duration_ms"] = message["duration_ms"]
+            result = dict(zip(RESULT_FIELDS, message[1:]))
+            results.append(result)
+            job = job_states.get(result["job_id"])
+            if job is not None:
+                if job["status"] == "queued":
+                    counts["queued"] -= 1
+                    counts["completed"] += 1
+                job["status"] = "completed"
+                job["completed_at"] = time.time()
+                job["duration_ms"] = result["duration_ms"]
         elif mtype == "log":
-            logs.append(message["msg"])
+            logs.append(message[1])
         elif mtype == "heartbeat":
-            worker.last_heartbeat = message["ts"]
+            worker.last_heartbeat = message[2]
         elif mtype == "shutdown":
-            logs.append(f"Worker shutdown (PID={message['pid']}) at {message['ts']:.2f}")
+            logs.append(f"Worker shutdown (PID={message[1]}) at {message[2]:.2f}")
 
 
 def _shutdown_worker(worker: WorkerState) -> None:
@@ -186,17 +206,15 @@ def main() -> None:
     worker = _get_or_start_worker()
     _drain_results(worker)
 
-    st.session_state.setdefault("final_worker_jobs", {})
+    jobs: Dict[str, Dict] = st.session_state.setdefault("final_worker_jobs", {})
+    counts: Dict[str, int] = st.session_state.setdefault("_final_worker_counts", {"queued": 0, "completed": 0})
     st.session_state.setdefault("final_worker_results", [])
     st.session_state.setdefault("final_worker_logs", [])
 
     col1, col2, col3 = st.columns(3)
     col1.metric("Worker PID", worker.pid or "—")
-    col2.metric("Queued jobs", sum(1 for j in st.session_state["final_worker_jobs"].values() if j["status"] == "queued"))
-    col3.metric(
-        "Completed jobs",
-        sum(1 for j in st.session_state["final_worker_jobs"].values() if j["status"] == "completed"),
-    )
+    col2.metric("Queued jobs", counts["queued"])
+    col3.metric("Completed jobs", counts["completed"])
 
     if worker.last_heartbeat:
         heartbeat_age = time.time() - worker.last_heartbeat
@@ -220,9 +238,7 @@ def main() -> None:
     if st.button("Poll results"):
         _drain_results(worker)
 
-    queued_jobs = [
-        job for job in st.session_state["final_worker_jobs"].values() if job["status"] == "queued"
-    ]
+    queued_jobs = [job for job in jobs.values() if job["status"] == "queued"] if counts["queued"] else []
     now = time.time()
     if queued_jobs:
         oldest = min(job["submitted_at"] for job in queued_jobs)
@@ -236,6 +252,7 @@ def main() -> None:
     if st.button("Shutdown worker"):
         _shutdown_worker(worker)
         st.session_state.pop("final_worker_jobs", None)
+        st.session_state.pop("_final_worker_counts", None)
         st.session_state.pop("final_worker_results", None)
         st.session_state.pop("final_worker_logs", None)
 
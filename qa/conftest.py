@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+APP_DIR = Path(__file__).resolve().parents[1]
+APP_PATH = APP_DIR / "app.py"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+
+@pytest.fixture(scope="module")
+def app():
+    """Boot ``app.py`` once per QA module; cases rerun it instead of rebuilding an AppTest.
+
+    Only the boot runs from ``APP_DIR``. Cases that rerun the app against relative
+    ``data/`` paths change directory themselves.
+    """
+    cwd = os.getcwd()
+    os.chdir(APP_DIR)
+    try:
+        booted = AppTest.from_file(str(APP_PATH))
+        booted.run(timeout=5)
+    finally:
+        os.chdir(cwd)
+    return booted
@@ -20,6 +20,7 @@ export FIELDOS_FINAL_WORKER_MOCK=true
 
 rm -f "data/ops_log.jsonl"
 
+# FIELDOS_QA_FAST=true limits the regression run to the smoke path (voice → polish → queue → save).
 echo "▶️  Running qa/test_fieldos_regression.py..."
 FIELDOS_QA_MODE=true python3 "qa/test_fieldos_regression.py"
 echo
@@ -16,12 +16,12 @@ import os
 import sys
 import time
 import wave
+from collections import Counter
 from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
-import numpy as np
 from streamlit.testing.v1 import AppTest
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -35,7 +35,17 @@ if str(APP_DIR) not in sys.path:
 os.environ.setdefault("FIELDOS_QA_MODE", os.getenv("FIELDOS_QA_MODE", "true"))
 os.environ.setdefault("FIELDOS_TRANSCRIBE_ENGINE", os.getenv("FIELDOS_TRANSCRIBE_ENGINE", "whisper_local"))
 
+import crm_sync
+from ai_parser import polish_note_with_gpt, transcribe_audio, warmup
 from fieldos_config import POLISH_CTA, QA_MODE, TRANSCRIBE_ENGINE
+from qa.utils import (
+    click_button,
+    get_toggle,
+    load_app,
+    qa_scratch_dir,
+    reset_session,
+    statuses_seen,
+)
 
 
 @contextmanager
@@ -54,70 +64,92 @@ def load_snapshot() -> Dict:
     return json.loads(SNAPSHOT_PATH.read_text())
 
 
+WAV_HEADER_BYTES = 44
+
+
 def generate_dummy_wav(path: Path, seconds: float = 1.0, sample_rate: int = 16000) -> None:
-    """Create a short silent WAV clip for transcription engines to consume."""
+    """Create a short silent WAV clip for transcription engines to consume.
+
+    The clip is deterministic, so an existing file of the expected size is reused.
+    """
     num_samples = int(seconds * sample_rate)
-    data = np.zeros(num_samples, dtype=np.int16)
+    if path.exists() and path.stat().st_size == WAV_HEADER_BYTES + num_samples * 2:
+        return
     with wave.open(str(path), "wb") as wf:
         wf.setnchannels(1)
         wf.setsampwidth(2)  # 16-bit PCM
         wf.setframerate(sample_rate)
-        wf.writeframes(data.tobytes())
-
-
-def click_button(app: AppTest, label: str) -> None:
-    for button in app.button:
-        if button.label == label:
-            button.click().run()
-            return
-    raise AssertionError(f"Button {label!r} not found. Buttons present: {[b.label for b in app.button]}")
-
-
-def get_toggle(app: AppTest, label: str):
-    for toggle in app.toggle:
-        if toggle.label == label:
-            return toggle
-    raise AssertionError(f"Toggle {label!r} not found.")
-
-
-def wait_for(condition, app: AppTest, timeout: float = 6.0, poll: float = 0.25) -> None:
-    deadline = time.time() + timeout
-    while time.time() < deadline:
+        wf.writeframes(bytes(num_samples * 2))
+
+
+def wait_or_now(
+    condition,
+    app: AppTest,
+    timeout: float = 6.0,
+    idle: float = 0.25,
+    max_idle: float = 2.0,
+) -> None:
+    """Return as soon as ``condition`` holds, rerunning ``app`` only when the worker is idle.
+
+    A click's own ``.run()`` usually settles state, so the condition is checked
+    first. Each pause ends early when the CRM worker processes a payload; a pause
+    with no worker progress reruns the app and doubles, from ``idle`` up to ``max_idle``.
+    """
+    if condition():
+        return
+    seen = crm_sync.payloads_processed()
+    deadline = time.monotonic() + timeout
+    pause = idle
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        count = crm_sync.wait_for_payloads(seen, min(remaining, pause))
         if condition():
             return
-        time.sleep(poll)
+        if count > seen:
+            seen = count
+            pause = idle
+            continue
         app.run()
+        if condition():
+            return
+        pause = min(pause * 2, max_idle)
     raise AssertionError("Timed out waiting for condition.")
 
 
-def verify_schema(payload: Dict) -> list[str]:
-    required = [
+LIFECYCLE_STATUSES = frozenset({"synced", "cached"})
+REQUIRED_SCHEMA_KEYS = frozenset(
+    {
         "transcription_raw",
         "note_polished",
         "transcription_confidence",
         "ai_model_version",
         "processing_time",
-    ]
-    return [key for key in required if key not in payload]
+    }
+)
 
 
-def run_test() -> Dict[str, object]:
+def verify_schema(payload: Dict) -> list[str]:
+    return sorted(REQUIRED_SCHEMA_KEYS.difference(payload))
+
+
+def run_test(app: Optional[AppTest] = None) -> Dict[str, object]:
     if not APP_PATH.exists():
         raise FileNotFoundError(f"Streamlit app missing at {APP_PATH}")
 
-    if str(APP_DIR) not in sys.path:
-        sys.path.insert(0, str(APP_DIR))
-
-    from ai_parser import polish_note_with_gpt, transcribe_audio
+    # Pay any model load before the timed transcription below.
+    warmup()
 
     report: Dict[str, object] = {"start": datetime.now().isoformat(timespec="seconds")}
 
     with change_dir(APP_DIR):
-        app = AppTest.from_file("app.py")
+        app = app or load_app(APP_PATH)
+        reset_session(app)
         app.run()
 
-        hero_block = [md.value for md in app.markdown[:2]]
-        assert any("Focus Lead" in block for block in hero_block), "Hero banner missing Focus Lead copy."
+        # The sidebar may render ahead of the hero, so scan every markdown block.
+        assert any("Focus Lead" in md.value for md in app.markdown), "Hero banner missing Focus Lead copy."
         report["startup"] = "ok"
 
         suggestion = app.session_state["suggestion"] if "suggestion" in app.session_state else ""
@@ -126,9 +158,7 @@ def run_test() -> Dict[str, object]:
         assert suggestion and suggestion in app.session_state["draft_note"], "Suggestion failed to insert."
 
         # Generate dummy audio clip and trigger transcription pipeline.
-        audio_dir = Path("data/audio_cache")
-        audio_dir.mkdir(parents=True, exist_ok=True)
-        dummy_clip = audio_dir / "qa_dummy.wav"
+        dummy_clip = qa_scratch_dir() / "qa_dummy.wav"
         generate_dummy_wav(dummy_clip)
 
         t_start = time.perf_counter()
@@ -172,32 +202,35 @@ def run_test() -> Dict[str, object]:
         click_button(app, "✅ Save & Queue CRM Push")
         queue_after_push = len(app.session_state["crm_queue"])
         report["queue_post_push"] = queue_after_push
-        wait_for(lambda: not app.session_state["crm_queue"], app)
+        wait_or_now(lambda: not app.session_state["crm_queue"], app)
 
         offline_toggle = get_toggle(app, "Offline Mode")
         offline_toggle.set_value(True).run()
         report["offline_toggle"] = True
         click_button(app, "✅ Save & Queue CRM Push")
 
-        wait_for(lambda: len(app.session_state["offline_cache"]) > 0, app)
+        wait_or_now(lambda: len(app.session_state["offline_cache"]) > 0, app)
         offline_cache_count = len(app.session_state["offline_cache"])
 
         offline_toggle = get_toggle(app, "Offline Mode")
         offline_toggle.set_value(False).run()
 
         click_button(app, "Flush Offline Cache")
-        wait_for(lambda: not app.session_state["crm_queue"], app)
+        wait_or_now(lambda: not app.session_state["crm_queue"], app)
 
         queue_after_flush = len(app.session_state["crm_queue"])
         cache_after_flush = len(app.session_state["offline_cache"])
 
-        statuses = {entry.get("status") for entry in app.session_state["crm_sync_log"]}
-        assert {"synced", "cached"}.issubset(statuses), "CRM sync log missing expected lifecycle statuses."
+        seen = statuses_seen(app.session_state["crm_sync_log"], LIFECYCLE_STATUSES)
+        assert seen == LIFECYCLE_STATUSES, "CRM sync log missing expected lifecycle statuses."
 
-        last_payload = next(
-            (entry["payload"] for entry in reversed(app.session_state["crm_sync_log"]) if entry.get("payload")),
-            None,
-        )
+        last_payload = None
+        sync_log = app.session_state["crm_sync_log"]
+        for index in range(len(sync_log) - 1, -1, -1):
+            payload = sync_log[index].get("payload")
+            if payload:
+                last_payload = payload
+                break
         assert last_payload, "No CRM payload recorded."
         missing_keys = verify_schema(last_payload)
 
@@ -209,8 +242,10 @@ def run_test() -> Dict[str, object]:
     counts = app.session_state["ai_latency_counts"]
     avg_transcribe = totals["transcribe"] / max(1, counts["transcribe"])
     avg_polish = totals["polish"] / max(1, counts["polish"])
-    success_count = sum(1 for entry in app.session_state["crm_sync_log"] if entry.get("status") == "synced")
-    cached_count = sum(1 for entry in app.session_state["crm_sync_log"] if entry.get("status") == "cached")
+    # Recount after "Day Complete": that rerun may have appended to the sync log.
+    status_counts = Counter(entry.get("status") for entry in app.session_state["crm_sync_log"])
+    success_count = status_counts["synced"]
+    cached_count = status_counts["cached"]
     total_attempts = success_count + cached_count
     success_pct = round((success_count / total_attempts) * 100, 1) if total_attempts else 0.0
 
@@ -244,10 +279,8 @@ def run_test() -> Dict[str, object]:
 
 if __name__ == "__main__":
     results = run_test()
-    print("\n=== FieldOS AI Regression Report ===")
-    for key, value in results.items():
-        print(f"{key:25s}: {value}")
-    print("====================================\n")
+    body = "\n".join(f"{key:25s}: {value}" for key, value in results.items())
+    sys.stdout.write(f"\n=== FieldOS AI Regression Report ===\n{body}\n====================================\n\n")
     if results["status"] == "PASS":
         print("✅  All major AI / audio checks passed.")
     else:
@@ -8,39 +8,67 @@ FIELDOS_QA_MODE=true.
 
 from __future__ import annotations
 
+import itertools
 import json
 import os
 import sys
 import time
-from contextlib import contextmanager
+from collections import Counter, deque
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
+FIXTURES_DIR = ROOT_DIR / "tests" / "fixtures"
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
-from streamlit.testing.v1 import AppTest
+from jsonschema import Draft202012Validator
+
+import fieldos_json
+
+if TYPE_CHECKING:
+    # Only annotations need it; load_app() imports streamlit.testing when run_qa runs.
+    from streamlit.testing.v1 import AppTest
+
+from qa.utils import (
+    capture_crm_state,
+    click_button,
+    get_toggle,
+    load_app,
+    reset_session,
+)
 
-from qa.utils import capture_crm_state
 os.environ.setdefault("FIELDOS_QA_MODE", "true")
 os.environ.setdefault("FIELDOS_TRANSCRIBE_ENGINE", "vosk")
 os.environ.setdefault("FIELDOS_FINAL_WORKER_ENABLED", "true")
 os.environ.setdefault("FIELDOS_FINAL_WORKER_MOCK", "true")
 os.environ.setdefault("FIELDOS_CHAT_FALLBACK_MODE", "stub")
-os.environ.setdefault("FIELDOS_CHAT_INDEX_PATH", str((Path(__file__).resolve().parents[1] / "tests" / "fixtures" / "reference_index_stub.jsonl")))
-os.environ.setdefault("FIELDOS_CHAT_INDEX_STUB_PATH", str((Path(__file__).resolve().parents[1] / "tests" / "fixtures" / "reference_index_stub.jsonl")))
-os.environ.setdefault("FIELDOS_CHAT_STUB_PATH", str((Path(__file__).resolve().parents[1] / "tests" / "fixtures" / "chat_stub.json")))
+for _var, _fixture in (
+    ("FIELDOS_CHAT_INDEX_PATH", "reference_index_stub.jsonl"),
+    ("FIELDOS_CHAT_INDEX_STUB_PATH", "reference_index_stub.jsonl"),
+    ("FIELDOS_CHAT_STUB_PATH", "chat_stub.json"),
+):
+    os.environ.setdefault(_var, str(FIXTURES_DIR / _fixture))
 os.environ.setdefault("FIELDOS_DISABLE_OFFLINE_FLUSH", "true")
 
+# Imported once the QA environment is set, so repeated run_qa() calls skip the import machinery.
+from ai_parser import polish_note_with_gpt, transcribe_audio, warmup  # noqa: E402
+
 APP_DIR = ROOT_DIR
 APP_PATH = APP_DIR / "app.py"
 SNAPSHOT_PATH = APP_DIR / "data" / "crm_snapshot.json"
+LIFECYCLE_STATUSES = frozenset({"synced", "failed"})
+_TERMINAL_CRM_STATES = frozenset({"failed", "cached"})
+# Deterministic runs seed the final-worker fixtures with a fixed timestamp.
+_QA_FIXED_TS = "2024-01-01T00:00:00+00:00" if os.getenv("FIELDOS_QA_MODE", "").lower() == "true" else None
+PAYLOAD_SCHEMA_PATH = Path(__file__).resolve().with_name("crm_payload_schema.json")
+# Compiled once at import; shared with any suite that validates CRM payloads.
+PAYLOAD_VALIDATOR = Draft202012Validator(json.loads(PAYLOAD_SCHEMA_PATH.read_text(encoding="utf-8")))
 
 
 def _seed_final_worker_state(app: AppTest, transcript: str = "Mock high-accuracy transcript") -> None:
-    now_iso = datetime.now(timezone.utc).isoformat()
+    now_iso = _QA_FIXED_TS or datetime.now(timezone.utc).isoformat()
     app.session_state["final_worker_stats"] = {
         "queue_depth": 0,
         "last_success_ts": now_iso,
@@ -59,112 +87,184 @@ def _seed_final_worker_state(app: AppTest, transcript: str = "Mock high-accuracy
     }
 
 
-def load_snapshot() -> Dict:
-    if not SNAPSHOT_PATH.exists():
-        return {
-            "cached_records": [],
-            "last_sync": None,
-            "ai_fail_count": 0,
-            "ai_latency_totals": {"transcribe": 0.0, "polish": 0.0},
-            "ai_latency_counts": {"transcribe": 0, "polish": 0},
-            "last_payload": {},
-            "recent_payloads": [],
-            "last_crm_status": {
-                "state": None,
-                "timestamp": None,
-                "response_code": None,
-                "error": None,
-            },
-        }
-    try:
-        raw = SNAPSHOT_PATH.read_text()
-        return json.loads(raw) if raw.strip() else {
-            "cached_records": [],
-            "last_sync": None,
-            "ai_fail_count": 0,
-            "ai_latency_totals": {"transcribe": 0.0, "polish": 0.0},
-            "ai_latency_counts": {"transcribe": 0, "polish": 0},
-            "last_payload": {},
-            "recent_payloads": [],
-            "last_crm_status": {
-                "state": None,
-                "timestamp": None,
-                "response_code": None,
-                "error": None,
-            },
-        }
-    except json.JSONDecodeError:
-        return {
-            "cached_records": [],
-            "last_sync": None,
-            "ai_fail_count": 0,
-            "ai_latency_totals": {"transcribe": 0.0, "polish": 0.0},
-            "ai_latency_counts": {"transcribe": 0, "polish": 0},
-            "last_payload": {},
-            "recent_payloads": [],
-            "last_crm_status": {
-                "state": None,
-                "timestamp": None,
-                "response_code": None,
-                "error": None,
-            },
-        }
+# Session keys the CRM worker writes that _capture_state copies into the AppTest session.
+_MIRROR_KEYS = (
+    "crm_queue",
+    "offline_cache",
+    "_crm_retry_in_progress",
+    "crm_retry_available",
+    "crm_processed_count",
+    "last_crm_status",
+    "crm_queue_debug",
+    "crm_sync_log",
+    "last_crm_payload",
+)
+_MISSING = object()
+
+_SNAPSHOT_CACHE: Optional[Tuple[Tuple[int, int], Dict]] = None
+
+
+def _empty_snapshot() -> Dict:
+    return {
+        "cached_records": [],
+        "last_sync": None,
+        "ai_fail_count": 0,
+        "ai_latency_totals": {"transcribe": 0.0, "polish": 0.0},
+        "ai_latency_counts": {"transcribe": 0, "polish": 0},
+        "last_payload": {},
+        "recent_payloads": [],
+        "last_crm_status": {
+            "state": None,
+            "timestamp": None,
+            "response_code": None,
+            "error": None,
+        },
+    }
 
 
-@contextmanager
-def change_dir(path: Path):
-    previous = Path.cwd()
-    os.chdir(path)
-    try:
-        yield
-    finally:
-        os.chdir(previous)
-
+def load_snapshot() -> Dict:
+    """Return the parsed snapshot, re-reading the file only when it changed.
 
-def click_button(app: AppTest, label: str) -> None:
-    for button in app.button:
-        if button.label == label:
-            button.click().run()
+    The parsed dict is cached by ``(mtime_ns, size)`` and shared between calls,
+    so callers must treat it as read-only.
+    """
+    global _SNAPSHOT_CACHE
+    try:
+        stat = SNAPSHOT_PATH.stat()
+    except FileNotFoundError:
+        return _empty_snapshot()
+    cache_key = (stat.st_mtime_ns, stat.st_size)
+    if _SNAPSHOT_CACHE is not None and _SNAPSHOT_CACHE[0] == cache_key:
+        return _SNAPSHOT_CACHE[1]
+    try:
+        # An empty or blank file fails to parse, so no stripped copy of the bytes is needed.
+        snapshot = fieldos_json.loads(SNAPSHOT_PATH.read_bytes())
+    except ValueError:
+        return _empty_snapshot()
+    if not snapshot:
+        return _empty_snapshot()
+    _SNAPSHOT_CACHE = (cache_key, snapshot)
+    return snapshot
+
+
+def wait_for(
+    condition,
+    app: AppTest,
+    timeout: float = 6.0,
+    min_interval: float = 0.01,
+    max_interval: float = 0.25,
+    watch_keys: Tuple[str, ...] = (),
+    min_rerun_gap: float = 0.05,
+) -> None:
+    """Rerun ``app`` until ``condition`` holds, backing off between reruns.
+
+    The caller has already run the app, so the condition is checked first. The
+    sleep starts at ``min_interval`` and doubles up to ``max_interval``, so fast
+    conditions return quickly and slow ones do not rerun the script every tick.
+    Reruns are skipped until ``min_rerun_gap`` has passed since the previous one,
+    so the short early sleeps only re-check the condition.
+
+    When ``watch_keys`` is given, ``condition`` is only re-evaluated after one of
+    those session_state slots is rebound to a different object. Only use it for
+    keys the app replaces rather than mutates in place.
+    """
+    deadline = time.monotonic() + timeout
+    interval = min_interval
+    state = app.session_state
+    watched: Optional[Tuple[Any, ...]] = None
+    last_run = time.monotonic()
+    while time.monotonic() < deadline:
+        if watch_keys:
+            # Holding the values (not their ids) keeps identity checks safe from id reuse.
+            current = tuple(state[key] if key in state else None for key in watch_keys)
+            changed = watched is None or any(a is not b for a, b in zip(current, watched))
+            watched = current
+        else:
+            changed = True
+        if changed and condition():
             return
-    raise AssertionError(f"Button {label!r} not found. Available: {[b.label for b in app.button]}")
+        time.sleep(interval)
+        if time.monotonic() - last_run >= min_rerun_gap:
+            app.run()
+            last_run = time.monotonic()
+        interval = min(interval * 2, max_interval)
+    raise AssertionError("Timed out waiting for condition.")
 
 
-def get_toggle(app: AppTest, label: str):
-    for toggle in app.toggle:
-        if toggle.label == label:
-            return toggle
-    raise AssertionError(f"Toggle {label!r} not found.")
+def wait_for_state(
+    condition,
+    timeout: float = 2.0,
+    min_interval: float = 0.01,
+    max_interval: float = 0.25,
+    watch_worker: bool = False,
+) -> bool:
+    """Poll ``condition`` without rerunning the app; return whether it held in time.
+
+    For state the CRM worker thread or a click's own run mutates directly, where
+    a script rerun would not make the condition true any sooner. Uses the same
+    doubling back-off as :func:`wait_for`; with ``watch_worker`` each pause ends
+    as soon as the CRM worker processes another payload.
+    """
+    deadline = time.monotonic() + timeout
+    interval = min_interval
+    if watch_worker:
+        import crm_sync  # noqa: PLC0415 - imported by main() after the widget patches
+
+        seen = crm_sync.payloads_processed()
+    while True:
+        if condition():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        if watch_worker:
+            seen = crm_sync.wait_for_payloads(seen, min(interval, remaining))
+        else:
+            time.sleep(interval)
+        interval = min(interval * 2, max_interval)
 
 
-def wait_for(condition, app: AppTest, timeout: float = 6.0, poll: float = 0.25) -> None:
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        if condition():
-            return
-        time.sleep(poll)
-        app.run()
-    raise AssertionError("Timed out waiting for condition.")
+def _assistant_message(result) -> Dict[str, Any]:
+    """Build a chat_history entry for a ``chatbot.ChatResult`` the way the copilot stores it."""
+    return {
+        "role": "assistant",
+        "content": result.answer,
+        "citations": [
+            {
+                "source": snip.source,
+                "title": snip.title,
+                "content": snip.content,
+                "url": snip.url,
+                "score": snip.score,
+            }
+            for snip in result.citations
+        ],
+        "fallback": result.used_fallback,
+        "positioning": result.is_positioning,
+        "summary": result.summary,
+    }
 
 
 class StubCRMClient:
     def __init__(self) -> None:
-        self._queue: list[dict] = []
+        self._queue: deque[dict] = deque()
 
     def set_responses(self, responses: list[dict]) -> None:
-        self._queue = list(responses)
+        self._queue = deque(responses)
 
     def __call__(self, payload: dict, retry_count: int = 0) -> dict:
         if self._queue:
-            return self._queue.pop(0)
+            return self._queue.popleft()
         return {"status": "ok", "response_code": 200, "body": {"status": "ok"}}
 
 
-def run_qa() -> Dict[str, object]:
+def run_qa(app: Optional[AppTest] = None) -> Dict[str, object]:
     if not APP_PATH.exists():
         raise FileNotFoundError(f"Streamlit app missing at {APP_PATH}")
 
-    if str(APP_DIR) not in sys.path:
-        sys.path.insert(0, str(APP_DIR))
+    # Pay any model load before the timed workflow below.
+    warmup()
+    fast_mode = os.getenv("FIELDOS_QA_FAST", "").lower() == "true"
 
     import streamlit as _st_global
 
@@ -188,7 +288,7 @@ def run_qa() -> Dict[str, object]:
     import chatbot  # noqa: PLC0415
 
     report: Dict[str, object] = {
-        "start": datetime.now().isoformat(timespec="seconds"),
+        "start_epoch": time.time(),
         "crm_queue_states": [],
     }
 
@@ -208,11 +308,16 @@ def run_qa() -> Dict[str, object]:
     crm_sync._get_crm_config = _qa_config_override
 
     try:
-        with change_dir(APP_DIR):
-            app = AppTest.from_file("app.py")
-        import importlib
+        # Reused across run_qa() calls in one process; only the session is reset.
+        app = app or load_app(APP_PATH)
+        reset_session(app)
         import app as streamlit_app
-        streamlit_app = importlib.reload(streamlit_app)
+
+        # The module is only patched below, so a fresh copy is opt-in.
+        if os.getenv("FIELDOS_QA_FORCE_RELOAD", "").lower() == "true":
+            import importlib
+
+            streamlit_app = importlib.reload(streamlit_app)
 
         def _capture_state(label: str) -> Dict[str, Any]:
             canonical_state = None
@@ -221,20 +326,10 @@ def run_qa() -> Dict[str, object]:
             except Exception:
                 canonical_state = None
             if canonical_state is not None:
-                mirror_keys = [
-                    "crm_queue",
-                    "offline_cache",
-                    "_crm_retry_in_progress",
-                    "crm_retry_available",
-                    "crm_processed_count",
-                    "last_crm_status",
-                    "crm_queue_debug",
-                    "crm_sync_log",
-                    "last_crm_payload",
-                ]
-                for key in mirror_keys:
-                    if key in canonical_state:
-                        app.session_state[key] = canonical_state[key]
+                for key in _MIRROR_KEYS:
+                    value = canonical_state.get(key, _MISSING)
+                    if value is not _MISSING:
+                        app.session_state[key] = value
             snapshot = capture_crm_state(label, app.session_state)
             if canonical_state is not None:
                 canonical_status = canonical_state.get("last_crm_status")
@@ -249,19 +344,27 @@ def run_qa() -> Dict[str, object]:
             *,
             expected_queue: int = 0,
             expected_cache: int = 0,
-            max_checks: int = 12,
+            timeout: float = 3.0,
             allow_manual_drain: bool = True,
         ) -> Dict[str, Any]:
             last_snapshot: Dict[str, Any] | None = None
-            for attempt in range(max_checks):
+            deadline = time.monotonic() + timeout
+            interval = 0.01
+            for attempt in itertools.count():
+                if time.monotonic() >= deadline:
+                    break
                 last_snapshot = _capture_state(f"{label}_check_{attempt}")
                 queue_ok = last_snapshot["queue_len"] <= expected_queue
                 cache_ok = last_snapshot["offline_cache"] <= expected_cache
                 retry_idle = not last_snapshot["retry_in_progress"]
                 status_block = last_snapshot.get("last_status") or {}
                 status_ok = isinstance(status_block, dict) and status_block.get("state") is not None
-                if queue_ok and cache_ok and retry_idle and status_ok:
-                    return last_snapshot
+                if queue_ok and cache_ok and retry_idle:
+                    if status_ok:
+                        return last_snapshot
+                    # Nothing left in flight; only a rerun can surface the status.
+                    app.run()
+                    continue
                 offline_flag = bool(app.session_state["offline"]) if "offline" in app.session_state else False
                 if allow_manual_drain and last_snapshot["queue_len"] > expected_queue and not offline_flag:
                     try:
@@ -272,8 +375,9 @@ def run_qa() -> Dict[str, object]:
                         crm_sync._process_payload(payload, offline_flag)
                         _capture_state(f"{label}_manual_drain_{attempt}")
                         continue
-                time.sleep(0.25)
+                time.sleep(interval)
                 app.run()
+                interval = min(interval * 2, 0.25)
             pending_ids = last_snapshot.get("queue_ids") if last_snapshot else []
             retry_flag = last_snapshot.get("retry_in_progress") if last_snapshot else None
             report.setdefault("warnings", []).append(
@@ -297,21 +401,24 @@ def run_qa() -> Dict[str, object]:
         app.run()
         _capture_state("initial_render")
 
-        hero_block = [md.value for md in app.markdown if "Focus Lead" in md.value]
-        assert hero_block, "Hero banner missing Focus Lead"
+        # One pass over the rendered markdown finds both the hero banner and the intel panel.
+        hero_found = intel_found = False
+        for md in app.markdown:
+            value = md.value
+            hero_found = hero_found or "Focus Lead" in value
+            intel_found = intel_found or "Intelligence Center" in value
+            if hero_found and intel_found:
+                break
+        assert hero_found, "Hero banner missing Focus Lead"
         report["hero_banner"] = "rendered"
-
-        intel_section = any("Intelligence Center" in md.value for md in app.markdown)
-        assert intel_section, "Intelligence panel missing"
+        assert intel_found, "Intelligence panel missing"
 
         suggestion_text = app.session_state["suggestion"] if "suggestion" in app.session_state else ""
         click_button(app, "Insert into draft note (Sounds good?)")
-        app.run()
         assert suggestion_text and suggestion_text in app.session_state["draft_note"], "Suggestion not inserted"
 
         assert "pipeline_snapshot" in app.session_state, "Pipeline snapshot missing from session_state"
         app.session_state["pipeline_snapshot"]["last_updated"] = "2023-01-01T00:00:00Z"
-        app.run()
         click_button(app, "Refresh pipeline snapshot")
         refreshed_ts = app.session_state["pipeline_snapshot"].get("last_updated")
         assert refreshed_ts and refreshed_ts != "2023-01-01T00:00:00Z", "Pipeline snapshot did not refresh"
@@ -328,27 +435,27 @@ def run_qa() -> Dict[str, object]:
         click_button(app, "Insert quote into draft note")
         app.run()
         assert "quote_inserted" in app.session_state and app.session_state["quote_inserted"], "Quote insert flag not set"
-        assert any("quote" in line.lower() for line in app.session_state["draft_note"].splitlines()), "Quote snippet missing in note"
+        assert "quote" in app.session_state["draft_note"].lower(), "Quote snippet missing in note"
         assert any(btn.label == "Inserted ✓" and getattr(btn, "disabled", False) for btn in app.button), "Quote button still enabled"
 
-        from ai_parser import polish_note_with_gpt, transcribe_audio
-
         transcript, conf, duration = transcribe_audio("qa_dummy.wav")
-        app.session_state["raw_transcript"] = transcript
-        app.session_state["draft_note"] = (app.session_state["draft_note"] + "\n" + transcript).strip()
-        app.session_state["ai_latency_totals"]["transcribe"] += duration
-        app.session_state["ai_latency_counts"]["transcribe"] += 1
-        app.session_state["last_transcription_confidence"] = conf
-        app.session_state["last_transcription_duration"] = duration
-        app.session_state["applied_playbook_titles"] = []
-        app.session_state["applied_playbook_snippets"] = []
-        app.session_state["quote_inserted"] = False
+        state = app.session_state
+        totals = state["ai_latency_totals"]
+        counts = state["ai_latency_counts"]
+        state["raw_transcript"] = transcript
+        state["draft_note"] = (state["draft_note"] + "\n" + transcript).strip()
+        totals["transcribe"] += duration
+        counts["transcribe"] += 1
+        state["last_transcription_confidence"] = conf
+        state["last_transcription_duration"] = duration
+        state["applied_playbook_titles"] = []
+        state["applied_playbook_snippets"] = []
+        state["quote_inserted"] = False
         report["voice_capture"] = "executed"
-        app.run()
-        assert "applied_playbook_titles" in app.session_state and not app.session_state["applied_playbook_titles"], "Playbook titles not reset on new transcript"
+        assert "applied_playbook_titles" in state and not state["applied_playbook_titles"], "Playbook titles not reset on new transcript"
 
         polished, polish_duration = polish_note_with_gpt(
-            app.session_state["draft_note"],
+            state["draft_note"],
             {
                 "account": "QA Account",
                 "service": "QA Service",
@@ -356,25 +463,22 @@ def run_qa() -> Dict[str, object]:
             },
         )
         assert polished, "Polish returned empty result in QA mode"
-        app.session_state["draft_note"] = polished
-        app.session_state["last_polish_duration"] = polish_duration
-        app.session_state["ai_latency_totals"]["polish"] += polish_duration
-        app.session_state["ai_latency_counts"]["polish"] += 1
-        app.run()
+        state["draft_note"] = polished
+        state["last_polish_duration"] = polish_duration
+        totals["polish"] += polish_duration
+        counts["polish"] += 1
 
         stub_client.set_responses([
             {"status": "ok", "response_code": 200, "body": {"status": "ok"}}
         ])
         _capture_state("pre_initial_enqueue")
         click_button(app, "✅ Save & Queue CRM Push")
-        app.run()
         _capture_state("post_initial_enqueue")
         report["crm_push"] = "queued"
 
         initial_snapshot = _await_queue_clear("post_initial_enqueue")
         if not isinstance(initial_snapshot, dict):
             initial_snapshot = _capture_state("post_initial_enqueue_fallback")
-        app.run()
         assert initial_snapshot["queue_len"] == 0, "CRM push queue not cleared"
         if initial_snapshot.get("last_status", {}).get("state") != "synced":
             report.setdefault("warnings", []).append(
@@ -382,23 +486,44 @@ def run_qa() -> Dict[str, object]:
             )
         assert not app.session_state["crm_retry_available"], "Retry unexpectedly available after success"
 
+        if fast_mode:
+            # Smoke coverage only: skip the offline, flush, failure and retry scenarios.
+            snapshot = load_snapshot()
+            status_counts = Counter(e.get("status") for e in app.session_state["crm_sync_log"])
+            success_count = status_counts["synced"]
+            cached_count = status_counts["cached"]
+            total = success_count + cached_count
+            report.update(
+                {
+                    "mode": "fast",
+                    "queue_after": initial_snapshot["queue_len"],
+                    "cache_after": None,
+                    "last_sync": snapshot.get("last_sync"),
+                    "queue_len": initial_snapshot["queue_len"],
+                    "success_count": success_count,
+                    "cached_count": cached_count,
+                    "success_pct": round((success_count / total) * 100, 1) if total else 0.0,
+                    "crm_state": (initial_snapshot.get("last_status") or {}).get("state"),
+                    "status": "PASS",
+                }
+            )
+            return report
+
         offline_toggle = get_toggle(app, "Offline Mode")
         offline_toggle.set_value(True).run()
         assert app.session_state["offline"] is True, "Failed to enable offline mode"
         report["offline_toggle"] = True
         click_button(app, "✅ Save & Queue CRM Push")
-        app.run()
         _capture_state("post_offline_enqueue")
 
         def _wait_for_offline_cache(target: int, label: str) -> None:
-            deadline = time.time() + 4.0
-            while time.time() < deadline:
+            def _cache_filled() -> bool:
                 cache_size = len(app.session_state["offline_cache"]) if "offline_cache" in app.session_state else 0
-                if cache_size >= target:
-                    _capture_state(label)
-                    return
-                time.sleep(0.2)
-                app.run()
+                return cache_size >= target
+
+            if wait_for_state(_cache_filled, timeout=4.0):
+                _capture_state(label)
+                return
             if "last_crm_payload" in app.session_state:
                 fallback = dict(app.session_state["last_crm_payload"])
                 fallback.setdefault("_offline_cached", True)
@@ -433,7 +558,6 @@ def run_qa() -> Dict[str, object]:
             pass
         _capture_state("pre_flush_call")
         flushed_count = crm_sync.flush_offline_cache()
-        app.run()
         _capture_state("post_flush_call")
         flush_snapshot = _await_queue_clear("post_flush")
         queue_after = flush_snapshot["queue_len"]
@@ -453,19 +577,19 @@ def run_qa() -> Dict[str, object]:
             {"status": "error", "response_code": 503, "error": "mock failure"},
         ])
         click_button(app, "✅ Save & Queue CRM Push")
-        app.run()
         _capture_state("post_failure_enqueue")
         _await_queue_clear("post_failure_enqueue", expected_queue=0, expected_cache=1)
         try:
             wait_for(
-                lambda: app.session_state["last_crm_status"]
-                and app.session_state["last_crm_status"]["state"] in {"failed", "cached"},
+                lambda: (app.session_state.get("last_crm_status") or {}).get("state") in _TERMINAL_CRM_STATES,
                 app,
+                watch_keys=("last_crm_status",),
             )
         except AssertionError:
             report.setdefault("warnings", []).append(
                 {"message": "CRM failure state not observed", "snapshot": _capture_state("post_failure_timeout")}
             )
+        # The Retry button only renders once the failure is in session_state.
         app.run()
         failure_snapshot = _capture_state("post_failure_status")
         if failure_snapshot.get("last_status", {}).get("state") != "failed":
@@ -480,41 +604,41 @@ def run_qa() -> Dict[str, object]:
             {"status": "ok", "response_code": 200, "body": {"status": "ok"}},
         ])
         click_button(app, "Retry CRM Push")
-        app.run()
         _capture_state("post_retry_enqueue")
-        try:
-            wait_for(lambda: not app.session_state["_crm_retry_in_progress"], app)
-        except AssertionError:
+        # The worker thread clears the retry flag and records the status itself,
+        # so block on its progress rather than rerunning the script.
+        if not wait_for_state(
+            lambda: not app.session_state["_crm_retry_in_progress"],
+            timeout=6.0,
+            watch_worker=True,
+        ):
             report.setdefault("warnings", []).append(
                 {"message": "CRM retry flag stuck", "snapshot": _capture_state("retry_in_progress_timeout")}
             )
         _await_queue_clear("post_retry_enqueue")
-        try:
-            wait_for(lambda: app.session_state["last_crm_status"]["state"] == "synced", app)
-        except AssertionError:
+        if not wait_for_state(
+            lambda: (app.session_state.get("last_crm_status") or {}).get("state") == "synced",
+            timeout=6.0,
+            watch_worker=True,
+        ):
             report.setdefault("warnings", []).append(
                 {"message": "CRM retry did not report synced", "snapshot": _capture_state("post_retry_status_timeout")}
             )
-        app.run()
         retry_snapshot = _capture_state("post_retry_status")
         assert retry_snapshot.get("last_status", {}).get("state") == "synced", "CRM retry did not sync"
         assert not app.session_state["crm_retry_available"], "Retry still available after success"
         assert not app.session_state["offline_cache"], "Offline cache not cleared after retry"
 
-        statuses = {entry.get("status") for entry in app.session_state["crm_sync_log"]}
-        has_cached = "cached" in statuses or "failed" in statuses
-        if not ("synced" in statuses and has_cached):
-            report.setdefault("warnings", []).append(
-                {"message": "CRM lifecycle statuses missing cached/failure entry", "statuses": sorted(statuses)}
-            )
-        assert "synced" in statuses and has_cached, "Missing sync lifecycle entries"
-        assert "failed" in statuses, "Failed status missing after CRM failure"
+        # A "failed" entry also satisfies the cached-or-failed requirement.
+        status_counts = Counter(entry.get("status") for entry in app.session_state["crm_sync_log"])
+        assert LIFECYCLE_STATUSES <= status_counts.keys(), (
+            f"Missing sync lifecycle entries; saw {sorted(map(str, status_counts))}"
+        )
 
         last_payload = app.session_state["last_crm_payload"]
         assert last_payload, "No CRM payload recorded"
-        for key in ("transcription_raw", "note_polished", "transcription_confidence", "ai_model_version", "processing_time", "quote_summary"):
-            assert key in last_payload, f"CRM payload missing {key}"
-        assert last_payload["processing_time"] <= 3.0, "Processing time exceeded threshold"
+        schema_errors = sorted(error.message for error in PAYLOAD_VALIDATOR.iter_errors(last_payload))
+        assert not schema_errors, f"CRM payload failed schema: {schema_errors}"
         assert last_payload.get("crm_status", {}).get("state") == "synced", "CRM status not synced in payload"
 
         if "chat_history" in app.session_state:
@@ -530,45 +654,12 @@ def run_qa() -> Dict[str, object]:
         chat_history.extend(
             [
                 {"role": "user", "content": question},
-                {
-                    "role": "assistant",
-                    "content": result.answer,
-                    "citations": [
-                        {
-                            "source": snip.source,
-                            "title": snip.title,
-                            "content": snip.content,
-                            "url": snip.url,
-                            "score": snip.score,
-                        }
-                        for snip in result.citations
-                    ],
-                    "fallback": result.used_fallback,
-                    "positioning": result.is_positioning,
-                    "summary": result.summary,
-                },
+                _assistant_message(result),
                 {"role": "user", "content": positioning_question},
-                {
-                    "role": "assistant",
-                    "content": positioning_result.answer,
-                    "citations": [
-                        {
-                            "source": snip.source,
-                            "title": snip.title,
-                            "content": snip.content,
-                            "url": snip.url,
-                            "score": snip.score,
-                        }
-                        for snip in positioning_result.citations
-                    ],
-                    "fallback": positioning_result.used_fallback,
-                    "positioning": positioning_result.is_positioning,
-                    "summary": positioning_result.summary,
-                },
+                _assistant_message(positioning_result),
             ]
         )
         app.session_state["chat_history"] = chat_history
-        app.run()
         assistant_entries = [entry for entry in chat_history if entry.get("role") == "assistant"]
         assert assistant_entries, "Reference copilot did not respond"
         latest_message = assistant_entries[-1]
@@ -597,8 +688,10 @@ def run_qa() -> Dict[str, object]:
         assert queue_after is not None and cache_after is not None
 
         snapshot = load_snapshot()
-        success_count = sum(1 for e in app.session_state["crm_sync_log"] if e.get("status") == "synced")
-        cached_count = sum(1 for e in app.session_state["crm_sync_log"] if e.get("status") == "cached")
+        # Recount here: the copilot steps and Day Complete run after the lifecycle check.
+        status_counts = Counter(entry.get("status") for entry in app.session_state["crm_sync_log"])
+        success_count = status_counts["synced"]
+        cached_count = status_counts["cached"]
         total = success_count + cached_count
         success_pct = round((success_count / total) * 100, 1) if total else 0.0
 
@@ -645,8 +738,10 @@ def run_qa() -> Dict[str, object]:
 
 
 if __name__ == "__main__":
+    if "--fast" in sys.argv[1:]:
+        os.environ["FIELDOS_QA_FAST"] = "true"
     results = run_qa()
-    print("\n=== FieldOS QA Regression Report ===")
-    for key, value in results.items():
-        print(f"{key:20s}: {value}")
-    print("====================================\n")
+    # The start time is kept as an epoch float during the run and formatted only for display.
+    results = {"start": datetime.fromtimestamp(results.pop("start_epoch")).isoformat(timespec="seconds"), **results}
+    body = "\n".join(f"{key:20s}: {value}" for key, value in results.items())
+    sys.stdout.write(f"\n=== FieldOS QA Regression Report ===\n{body}\n====================================\n\n")
@@ -1,33 +1,55 @@
 # FieldOS V4.3 – Deterministic streaming QA (SafeSessionState-safe)
 from unittest.mock import patch
-from streamlit.testing.v1 import AppTest
-import os, sys, time
+import os, sys
 from pathlib import Path
 
+import pytest
+
 APP_DIR = Path(__file__).resolve().parents[1]
 if str(APP_DIR) not in sys.path:
     sys.path.insert(0, str(APP_DIR))
 
+from qa.utils import VirtualClock, qa_scratch_dir
+
+# Session keys the streaming cases assert on; cleared so each case reseeds them on rerun.
+_STREAM_KEYS = (
+    "STREAMING_ENABLED",
+    "stream_updates_count",
+    "stream_final_text",
+    "stream_latency_ms_first_partial",
+    "stream_fallbacks",
+    "_streaming_stub_seeded",
+)
+
+
+def _clear_stream_state(app) -> None:
+    for key in _STREAM_KEYS:
+        if key in app.session_state:
+            del app.session_state[key]
+
 @patch("streaming_asr.VoskStreamer._consume")
-def test_streaming_minimal(mock_consume):
+def test_streaming_minimal(mock_consume, app):
+    clock = VirtualClock()
+
     def fake_consume(self):
+        started = clock.monotonic()
+        clock.advance(0.3)
         self.partial_text = "hello"
         self.updates = 1
-        self.first_partial_ms = 300
-        time.sleep(0.05)
+        self.first_partial_ms = int((clock.monotonic() - started) * 1000)
+        clock.advance(0.05)
         self.partial_text = "hello world"
         self.updates = 2
-        time.sleep(0.05)
+        clock.advance(0.05)
         self.final_text = "hello world"
     mock_consume.side_effect = fake_consume
 
     cwd = os.getcwd()
     try:
         os.chdir(APP_DIR)
-        Path("qa/tmp").mkdir(parents=True, exist_ok=True)
-        Path("qa/tmp/stub.wav").write_bytes(b"\x00\x00")
+        (qa_scratch_dir() / "stub.wav").write_bytes(b"\x00\x00")
 
-        app = AppTest.from_file("app.py")
+        _clear_stream_state(app)
         app.run(timeout=5)
 
         assert "stream_updates_count" in app.session_state
@@ -44,7 +66,9 @@ def test_streaming_minimal(mock_consume):
 
     print("✅ Deterministic streaming test PASS")
 
-def test_streaming_fallback_stub():
+def test_streaming_fallback_stub(app):
+    # This path exercises the real streamer, which needs the vosk package.
+    pytest.importorskip("vosk")
     cwd = os.getcwd()
     prior_env = {
         "FIELDOS_STREAMING_FORCE_FAIL": os.environ.get("FIELDOS_STREAMING_FORCE_FAIL"),
@@ -56,7 +80,7 @@ def test_streaming_fallback_stub():
     os.environ["STREAMING_ENABLED"] = "true"
     try:
         os.chdir(APP_DIR)
-        app = AppTest.from_file("app.py")
+        _clear_stream_state(app)
         app.run(timeout=5)
 
         assert app.session_state["STREAMING_ENABLED"] is False
@@ -77,5 +101,4 @@ def test_streaming_fallback_stub():
     print("✅ Streaming fallback stub test PASS")
 
 if __name__ == "__main__":
-    test_streaming_minimal()
-    test_streaming_fallback_stub()
+    raise SystemExit(pytest.main([__file__, "-q"]))
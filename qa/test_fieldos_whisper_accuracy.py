@@ -13,7 +13,7 @@ import os
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 from unittest.mock import patch
 
 from streamlit.testing.v1 import AppTest
@@ -21,7 +21,6 @@ from streamlit.testing.v1 import AppTest
 ROOT_DIR = Path(__file__).resolve().parents[1]
 APP_DIR = ROOT_DIR
 APP_PATH = APP_DIR / "app.py"
-DUMMY_CLIP = ROOT_DIR / "qa" / "tmp" / "stubbed_clip.wav"
 
 os.environ.setdefault("FIELDOS_QA_MODE", "false")
 os.environ.setdefault("FIELDOS_TRANSCRIBE_ENGINE", "whisper_local")
@@ -31,6 +30,10 @@ if str(APP_DIR) not in os.sys.path:
     os.sys.path.insert(0, str(APP_DIR))
 
 import ai_parser  # noqa: E402
+import crm_sync  # noqa: E402
+from qa.utils import qa_scratch_dir  # noqa: E402
+
+DUMMY_CLIP = qa_scratch_dir() / "stubbed_clip.wav"
 
 
 def ensure_session_defaults(app: AppTest) -> None:
@@ -79,6 +82,18 @@ def apply_transcription(
     }
 
 
+def wait_for_crm_drain(app: AppTest, timeout: float = 2.0) -> bool:
+    """Give the CRM worker thread real time to drain the queue; return whether it emptied."""
+    deadline = time.monotonic() + timeout
+    seen = crm_sync.payloads_processed()
+    while "crm_queue" in app.session_state and app.session_state["crm_queue"]:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        seen = crm_sync.wait_for_payloads(seen, remaining)
+    return True
+
+
 def run_clip(app: AppTest, label: str, offline: bool = False) -> Dict[str, float]:
     ensure_session_defaults(app)
     base_fail = app.session_state["ai_fail_count"]
@@ -95,7 +110,7 @@ def run_clip(app: AppTest, label: str, offline: bool = False) -> Dict[str, float
             if button.label == "Flush Offline Cache":
                 button.click().run()
                 break
-        time.sleep(0.5)
+        wait_for_crm_drain(app)
 
     result["label"] = label
     return result
@@ -110,15 +125,15 @@ STUB_TRANSCRIPTS = [
 
 
 @patch("ai_parser.transcribe_audio", side_effect=STUB_TRANSCRIPTS)
-def run_suite(mock_transcribe) -> List[Dict[str, float]]:
+def run_suite(mock_transcribe, app: Optional[AppTest] = None) -> List[Dict[str, float]]:
     previous_cwd = os.getcwd()
     os.chdir(APP_DIR)
     try:
-        DUMMY_CLIP.parent.mkdir(parents=True, exist_ok=True)
         DUMMY_CLIP.write_bytes(b"\x00\x00")
 
-        app = AppTest.from_file("app.py")
-        app.run(timeout=5)
+        if app is None:
+            app = AppTest.from_file(str(APP_PATH))
+            app.run(timeout=5)
 
         results = [
             run_clip(app, "Quiet office"),
@@ -131,6 +146,11 @@ def run_suite(mock_transcribe) -> List[Dict[str, float]]:
         os.chdir(previous_cwd)
 
 
+def test_whisper_accuracy(app: AppTest) -> None:
+    rows = run_suite(app=app)
+    assert [row["ai_fail"] for row in rows] == ["No", "No", "Yes", "Yes"], rows
+
+
 if __name__ == "__main__":
     rows = run_suite()
     (ROOT_DIR / "qa" / "last_whisper_accuracy.json").write_text(json.dumps(rows, indent=2))
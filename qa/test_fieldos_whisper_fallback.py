@@ -15,6 +15,7 @@ import os
 import time
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 from unittest.mock import patch
 
 from streamlit.testing.v1 import AppTest
@@ -33,18 +34,18 @@ import ai_parser  # noqa: E402
 
 from ai_parser import transcribe_audio  # noqa: E402
 from fieldos_config import POLISH_CTA  # noqa: E402
+from qa.utils import qa_scratch_dir  # noqa: E402
 
 
-def run_whisper_fallback_test() -> dict:
+def run_whisper_fallback_test(app: Optional[AppTest] = None) -> dict:
     report = {"start": datetime.now().isoformat(timespec="seconds")}
-    app = AppTest.from_file(str(APP_PATH))
-    app.run(timeout=5)
+    if app is None:
+        app = AppTest.from_file(str(APP_PATH))
+        app.run(timeout=5)
 
     baseline_fail = app.session_state["ai_fail_count"] if "ai_fail_count" in app.session_state else 0
 
-    dummy_dir = APP_DIR / "data" / "audio_cache"
-    dummy_dir.mkdir(parents=True, exist_ok=True)
-    dummy_clip = dummy_dir / "fallback_dummy.wav"
+    dummy_clip = qa_scratch_dir() / "fallback_dummy.wav"
     dummy_clip.write_bytes(b"")
 
     t0 = time.perf_counter()
@@ -73,6 +74,13 @@ def run_whisper_fallback_test() -> dict:
     return report
 
 
+def test_whisper_fallback(app: AppTest) -> None:
+    # Other QA modules enable QA mode at import; pin the settings this scenario relies on.
+    with patch("ai_parser.QA_MODE", False), patch("ai_parser.TRANSCRIBE_ENGINE", "whisper_local"):
+        report = run_whisper_fallback_test(app)
+    assert report["status"] == "PASS", report
+
+
 if __name__ == "__main__":
     results = run_whisper_fallback_test()
     print("\n=== FieldOS Whisper Fallback QA ===")
@@ -1,7 +1,79 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, Dict, Iterable, MutableMapping
+import atexit
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, AbstractSet, Any, Dict, FrozenSet, Iterable, MutableMapping, Tuple
+
+if TYPE_CHECKING:
+    from streamlit.testing.v1 import AppTest
+
+_APP_CACHE: Dict[Tuple[str, int], AppTest] = {}
+_SCRATCH_DIR: list[Path] = []
+
+
+def qa_scratch_dir() -> Path:
+    """Return a per-run scratch directory for dummy clips, removed at interpreter exit.
+
+    Lives under ``tempfile.gettempdir()`` so ``TMPDIR=/dev/shm`` keeps QA writes in RAM
+    and out of the source tree.
+    """
+    if not _SCRATCH_DIR:
+        path = Path(tempfile.mkdtemp(prefix="fieldos_qa_"))
+        atexit.register(shutil.rmtree, path, ignore_errors=True)
+        _SCRATCH_DIR.append(path)
+    return _SCRATCH_DIR[0]
+
+
+def load_app(app_path: Path) -> AppTest:
+    """Return an AppTest for ``app_path``, reusing the instance while the file is unchanged."""
+    key = (str(app_path), app_path.stat().st_mtime_ns)
+    app = _APP_CACHE.get(key)
+    if app is None:
+        from streamlit.testing.v1 import AppTest  # noqa: PLC0415
+
+        _APP_CACHE.clear()
+        app = _APP_CACHE[key] = AppTest.from_file(str(app_path))
+    return app
+
+
+def reset_session(app: AppTest) -> None:
+    """Drop every session_state key so a reused AppTest starts clean on its next run."""
+    for key in list(app.session_state.keys()):
+        del app.session_state[key]
+
+
+class VirtualClock:
+    """Monotonic clock for fakes that simulate pacing; ``sleep`` advances time without blocking."""
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._now = start
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float) -> None:
+        self._now += max(0.0, seconds)
+
+    sleep = advance
+
+
+def click_button(app: AppTest, label: str) -> None:
+    for button in app.button:
+        if button.label == label:
+            button.click().run()
+            return
+    raise AssertionError(f"Button {label!r} not found. Available: {[button.label for button in app.button]}")
+
+
+def get_toggle(app: AppTest, label: str):
+    for toggle in app.toggle:
+        if toggle.label == label:
+            return toggle
+    raise AssertionError(f"Toggle {label!r} not found.")
 
 
 def _safe_ids(payloads: Iterable[Dict[str, Any]]) -> list[str]:
@@ -17,6 +89,24 @@ def _safe_ids(payloads: Iterable[Dict[str, Any]]) -> list[str]:
     return identifiers
 
 
+# The debug log list capture_crm_state last created; only that one is safe to append to in place,
+# since a mirrored ``crm_queue_debug`` may still be the app's own list.
+_OWNED_DEBUG_LOG: Dict[str, Any] = {"log": None}
+
+
+_TS_CACHE: Dict[str, Any] = {"sec": None, "text": ""}
+
+
+def _utc_timestamp() -> str:
+    """Second-resolution UTC ISO timestamp, formatted once per wall-clock second."""
+    sec = int(time.time())
+    if sec != _TS_CACHE["sec"]:
+        # Naive ISO text, matching the previous utcnow() output (no "+00:00" suffix).
+        stamp = datetime.fromtimestamp(sec, timezone.utc).replace(tzinfo=None)
+        _TS_CACHE.update(sec=sec, text=stamp.isoformat(timespec="seconds"))
+    return _TS_CACHE["text"]
+
+
 def _lookup(state: MutableMapping[str, Any], key: str, default: Any) -> Any:
     try:
         return state[key]
@@ -24,16 +114,28 @@ def _lookup(state: MutableMapping[str, Any], key: str, default: Any) -> Any:
         return default
 
 
+def statuses_seen(sync_log: Iterable[Dict[str, Any]], wanted: AbstractSet[str]) -> FrozenSet[str]:
+    """Return which ``wanted`` statuses occur in ``sync_log``, stopping once all are found."""
+    seen: set[str] = set()
+    for entry in sync_log:
+        status = entry.get("status")
+        if status in wanted and status not in seen:
+            seen.add(status)
+            if len(seen) == len(wanted):
+                break
+    return frozenset(seen)
+
+
 def capture_crm_state(label: str, session_state: MutableMapping[str, Any]) -> Dict[str, Any]:
-    queue: list[Dict[str, Any]] = list(_lookup(session_state, "crm_queue", []))
-    offline_cache: list[Dict[str, Any]] = list(_lookup(session_state, "offline_cache", []))
+    queue = _lookup(session_state, "crm_queue", None) or ()
+    offline_cache = _lookup(session_state, "offline_cache", None) or ()
     retrying = bool(_lookup(session_state, "_crm_retry_in_progress", False))
     retry_available = bool(_lookup(session_state, "crm_retry_available", False))
     processed = int(_lookup(session_state, "crm_processed_count", 0) or 0)
     last_status = _lookup(session_state, "last_crm_status", None)
     snapshot = {
         "event": label,
-        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "timestamp": _utc_timestamp(),
         "queue_len": len(queue),
         "offline_cache": len(offline_cache),
         "retry_in_progress": retrying,
@@ -43,7 +145,12 @@ def capture_crm_state(label: str, session_state: MutableMapping[str, Any]) -> Di
         "offline_cache_ids": _safe_ids(offline_cache),
         "last_status": last_status,
     }
-    debug_log = list(_lookup(session_state, "crm_queue_debug", []))
+    debug_log = _lookup(session_state, "crm_queue_debug", None)
+    if debug_log is not None and debug_log is _OWNED_DEBUG_LOG["log"]:
+        debug_log.append(snapshot)
+        return snapshot
+    debug_log = list(debug_log or ())
     debug_log.append(snapshot)
+    _OWNED_DEBUG_LOG["log"] = debug_log
     session_state["crm_queue_debug"] = debug_log
     return snapshot
@@ -1,23 +1,44 @@
 from __future__ import annotations
 
-import json
+import base64
+import hashlib
+import heapq
 import logging
 import math
 import os
+import pickle
 import re
-from dataclasses import dataclass
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, replace
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import fieldos_json
 
 LOGGER = logging.getLogger(__name__)
 
 DEFAULT_INDEX_PATH = Path(os.getenv("FIELDOS_CHAT_INDEX_PATH", "data/reference_index.jsonl"))
 DEFAULT_STUB_PATH = Path(os.getenv("FIELDOS_CHAT_INDEX_STUB_PATH", "tests/fixtures/reference_index_stub.jsonl"))
 DEFAULT_EMBED_MODEL = os.getenv("FIELDOS_CHAT_EMBED_MODEL", "text-embedding-3-small")
+# Parsed-index caches live in the repo's git-ignored .cache/, never next to the JSONL they mirror.
+INDEX_CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "reference_index"
+
+# Bump when _Record/Snippet change shape so stale pickled caches are ignored.
+_INDEX_CACHE_VERSION = 3
+
+_EMBED_CACHE_SIZE = 1024
+_EMBED_CACHE: "OrderedDict[Tuple[str, str], Tuple[float, ...]]" = OrderedDict()
+_EMBED_CACHE_LOCK = threading.Lock()
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
 
 _keyword_warning_logged = False
 _DEFAULT_INDEX: Optional["ReferenceIndex"] = None
+_DEFAULT_INDEX_LOCK = threading.Lock()
 
 
 def _load_openai_client():
@@ -41,11 +62,36 @@ def _load_openai_client():
         return None
 
 
+def _cached_embedding(model: str, query: str) -> Optional[Tuple[float, ...]]:
+    key = (model, query)
+    with _EMBED_CACHE_LOCK:
+        vector = _EMBED_CACHE.get(key)
+        if vector is not None:
+            _EMBED_CACHE.move_to_end(key)
+        return vector
+
+
+def _remember_embedding(model: str, query: str, embedding: Iterable[float]) -> Tuple[float, ...]:
+    """Store a query embedding in the LRU, evicting the least recently used entry."""
+    vector = tuple(embedding)
+    with _EMBED_CACHE_LOCK:
+        _EMBED_CACHE[(model, query)] = vector
+        _EMBED_CACHE.move_to_end((model, query))
+        while len(_EMBED_CACHE) > _EMBED_CACHE_SIZE:
+            _EMBED_CACHE.popitem(last=False)
+    return vector
+
+
+def _vector_dtype() -> np.dtype:
+    """Storage dtype for the unit matrix; float16 halves memory with negligible ranking loss."""
+    return np.dtype(os.getenv("FIELDOS_CHAT_VECTOR_DTYPE", "float16"))
+
+
 def _fallback_mode() -> str:
     return os.getenv("FIELDOS_CHAT_FALLBACK_MODE", "").lower()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Snippet:
     source: str
     title: str
@@ -59,7 +105,7 @@ class Snippet:
     metadata: Dict[str, Any]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class _Record:
     id: str
     vector: Optional[List[float]]
@@ -67,142 +113,223 @@ class _Record:
     tokens: List[str]
     bigrams: List[str]
     norm: float
+    token_counts: Counter
+    bigram_counts: Counter
+    tags_lower: Tuple[str, ...]
+    value_props_lower: Tuple[str, ...]
 
 
 class ReferenceIndex:
     """In-memory index of reference snippets with embedding vectors."""
 
-    def __init__(self, records: Sequence[_Record], embed_model: str) -> None:
+    def __init__(
+        self,
+        records: Sequence[_Record],
+        embed_model: str,
+        unit_matrix: Optional[Tuple[List[int], np.ndarray]] = None,
+    ) -> None:
         self.records = list(records)
         self.embed_model = embed_model
         self._client = None
+        rows, self._unit_matrix = unit_matrix if unit_matrix is not None else _build_unit_matrix(self.records)
+        self._vector_rows = rows
+        self._vector_records = [self.records[i] for i in rows]
+        self._token_postings, self._phrase_postings = _build_postings(self.records)
 
     def _ensure_client(self):
         if self._client is None:
             self._client = _load_openai_client()
         return self._client
 
-    def _embed_query(self, query: str) -> Optional[List[float]]:
+    def _embed_queries(self, queries: Sequence[str]) -> List[Optional[Tuple[float, ...]]]:
+        """Return an embedding per query, fetching only uncached ones in one request.
+
+        Queries whose embedding could not be fetched map to ``None`` so callers
+        can fall back to keyword ranking for them alone.
+        """
+        vectors = [_cached_embedding(self.embed_model, query) for query in queries]
+        missing = list(dict.fromkeys(query for query, vector in zip(queries, vectors) if vector is None))
+        if not missing:
+            return vectors
         client = self._ensure_client()
         if client is None:
-            return None
+            return vectors
         try:
-            response = client.embeddings.create(model=self.embed_model, input=[query])
+            response = client.embeddings.create(model=self.embed_model, input=missing)
         except Exception as exc:  # pragma: no cover - network guard
             LOGGER.info("Reference index falling back to keyword search (embedding error: %s)", exc)
-            return None
-        data = response.data[0]
-        return list(data.embedding)  # type: ignore[attr-defined]
+            return vectors
+        fetched = {
+            query: _remember_embedding(self.embed_model, query, item.embedding)  # type: ignore[attr-defined]
+            for query, item in zip(missing, response.data)
+        }
+        return [vector if vector is not None else fetched.get(query) for query, vector in zip(queries, vectors)]
 
-    def search(self, query: str, top_k: int = 4) -> List[Snippet]:
-        query = query.strip()
-        if not query:
-            return []
+    def _embed_query(self, query: str) -> Optional[List[float]]:
+        vector = self._embed_queries([query])[0]
+        return list(vector) if vector is not None else None
+
+    def _keyword_rank(self, query: str, top_k: Optional[int] = None) -> List[Snippet]:
+        """Keyword-rank only the records that can score for ``query``.
+
+        A record scores when it shares a token with the query or when a query
+        token is a substring of one of its tags or value props, so candidates
+        come from the token postings plus a scan of the distinct phrases.
+        """
+        query_tokens = set(_tokenise(query))
+        positions = set()
+        for token in query_tokens:
+            positions.update(self._token_postings.get(token, ()))
+        for phrase, phrase_positions in self._phrase_postings.items():
+            if any(token in phrase for token in query_tokens):
+                positions.update(phrase_positions)
+        return _keyword_rank([self.records[i] for i in sorted(positions)], query, top_k)
 
-        if _fallback_mode() == "stub":
-            return _keyword_rank(self.records, query)[:top_k]
-
-        query_vector = self._embed_query(query)
-        if query_vector is None:
-            return _keyword_rank(self.records, query)[:top_k]
-        scores = []
-        norm_q = math.sqrt(sum(v * v for v in query_vector))
-        if norm_q == 0:
-            return _keyword_rank(self.records, query)[:top_k]
-        for record in self.records:
-            if record.vector is None or record.norm == 0:
+    def search(self, query: str, top_k: int = 4) -> List[Snippet]:
+        return self.search_many([query], top_k=top_k)[0]
+
+    def search_many(self, queries: Sequence[str], top_k: int = 4) -> List[List[Snippet]]:
+        """Search several queries, embedding them in one request and scoring them in one matmul."""
+        stripped = [query.strip() for query in queries]
+        results: List[List[Snippet]] = [[] for _ in stripped]
+        pending = [position for position, query in enumerate(stripped) if query]
+        if not pending:
+            return results
+
+        if _fallback_mode() == "stub" or not self._vector_records:
+            for position in pending:
+                results[position] = self._keyword_rank(stripped[position], top_k)
+            return results
+
+        vectors = self._embed_queries([stripped[position] for position in pending])
+        dim = self._unit_matrix.shape[1]
+        vector_positions: List[int] = []
+        unit_queries: List[np.ndarray] = []
+        for position, vector in zip(pending, vectors):
+            query_array = np.asarray(vector, dtype=np.float32) if vector is not None else None
+            norm_q = float(np.linalg.norm(query_array)) if query_array is not None else 0.0
+            if norm_q == 0 or query_array.shape[0] != dim:
+                results[position] = self._keyword_rank(stripped[position], top_k)
                 continue
-            dot = sum(qv * rv for qv, rv in zip(query_vector, record.vector))
-            cosine = dot / (norm_q * record.norm)
-            scores.append((cosine, record.snippet))
-
-        if not scores:
-            return _keyword_rank(self.records, query)[:top_k]
-        scores.sort(key=lambda item: item[0], reverse=True)
-        top = []
-        for score, snippet in scores[:top_k]:
-            top.append(
-                Snippet(
-                    source=snippet.source,
-                    title=snippet.title,
-                    content=snippet.content,
-                    url=snippet.url,
-                    score=score,
-                    tags=snippet.tags,
-                    value_props=snippet.value_props,
-                    discount=snippet.discount,
-                    category=snippet.category,
-                    metadata=snippet.metadata,
-                )
-            )
-        return top
+            vector_positions.append(position)
+            unit_queries.append(query_array / norm_q)
+        if not vector_positions:
+            return results
+
+        # The stored matrix may be float16; scores are computed in float32.
+        cosine_rows = np.stack(unit_queries) @ self._unit_matrix.T.astype(np.float32, copy=False)
+        for position, cosines in zip(vector_positions, cosine_rows):
+            results[position] = self._top_snippets(cosines, top_k)
+        return results
+
+    def _top_snippets(self, cosines: np.ndarray, top_k: int) -> List[Snippet]:
+        count = min(top_k, cosines.shape[0])
+        if count <= 0:
+            return []
+        # Partition out the top_k candidates, then sort only those: highest score
+        # first, equal scores in record order.
+        if count < cosines.shape[0]:
+            candidates = np.argpartition(-cosines, count - 1)[:count]
+        else:
+            candidates = np.arange(count)
+        order = candidates[np.lexsort((candidates, -cosines[candidates]))]
+        return [replace(self._vector_records[i].snippet, score=float(cosines[i])) for i in order]
+
+
+def _build_unit_matrix(records: Sequence[_Record]) -> Tuple[List[int], np.ndarray]:
+    """Stack the non-zero record vectors into a row-normalised matrix.
+
+    Rows are normalised in float32 and stored as :func:`_vector_dtype`. Rows
+    whose dimension differs from the first vector's are skipped, so the matrix
+    stays rectangular; the returned indices map rows back to records.
+    """
+    rows: List[int] = []
+    vectors: List[List[float]] = []
+    dim: Optional[int] = None
+    for position, record in enumerate(records):
+        if record.vector is None or record.norm == 0:
+            continue
+        if dim is None:
+            dim = len(record.vector)
+        elif len(record.vector) != dim:
+            LOGGER.warning("Skipping reference vector %s with dimension %d (expected %d)", record.id, len(record.vector), dim)
+            continue
+        rows.append(position)
+        vectors.append(record.vector)
+    dtype = _vector_dtype()
+    if not vectors:
+        return rows, np.empty((0, 0), dtype=dtype)
+    matrix = np.asarray(vectors, dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return rows, matrix.astype(dtype, copy=False)
+
+
+def _build_postings(records: Sequence[_Record]) -> Tuple[Dict[str, List[int]], Dict[str, List[int]]]:
+    """Map tokens, and lowercased tags/value props, to the positions of records holding them."""
+    token_postings: Dict[str, List[int]] = {}
+    phrase_postings: Dict[str, List[int]] = {}
+    for position, record in enumerate(records):
+        for token in record.token_counts:
+            token_postings.setdefault(token, []).append(position)
+        for phrase in set(record.tags_lower).union(record.value_props_lower):
+            phrase_postings.setdefault(phrase, []).append(position)
+    return token_postings, phrase_postings
 
 
 def _tokenise(text: str) -> List[str]:
-    text = text.lower()
-    return re.findall(r"[a-z0-9]+", text)
+    return _TOKEN_RE.findall(text.lower())
 
 
 def _bigrams(tokens: Sequence[str]) -> List[str]:
     return [f"{tokens[i]} {tokens[i+1]}" for i in range(len(tokens) - 1)]
 
 
-def _keyword_rank(records: Sequence[_Record], query: str) -> List[Snippet]:
+def _keyword_rank(records: Sequence[_Record], query: str, top_k: Optional[int] = None) -> List[Snippet]:
     global _keyword_warning_logged
     if not _keyword_warning_logged:
         LOGGER.info("Reference index falling back to keyword search")
         _keyword_warning_logged = True
     query_tokens = _tokenise(query)
+    query_counts = Counter(query_tokens)
     query_bigrams = set(_bigrams(query_tokens))
     scores = []
     for record in records:
-        common = sum(record.tokens.count(tok) for tok in query_tokens)
-        common += sum(1 for bigram in record.bigrams if bigram in query_bigrams)
+        token_counts = record.token_counts
+        bigram_counts = record.bigram_counts
+        common = sum(token_counts[tok] * repeats for tok, repeats in query_counts.items())
+        common += sum(bigram_counts[bigram] for bigram in query_bigrams)
         snippet = record.snippet
+        # Tags and value props match on substrings, so these stay nested scans over
+        # the pre-lowercased strings; each distinct token is tested once and
+        # weighted by how often the query repeats it.
         tag_hits = sum(
-            1
-            for tag in snippet.tags
-            for token in query_tokens
-            if token in tag.lower()
+            repeats for tag in record.tags_lower for tok, repeats in query_counts.items() if tok in tag
         )
         value_hits = sum(
-            1
-            for prop in snippet.value_props
-            for token in query_tokens
-            if token in prop.lower()
+            repeats for prop in record.value_props_lower for tok, repeats in query_counts.items() if tok in prop
         )
         common += tag_hits * 2 + value_hits
         if common == 0:
             continue
         scores.append((float(common), snippet))
-    scores.sort(key=lambda item: item[0], reverse=True)
-    return [
-        Snippet(
-            source=snippet.source,
-            title=snippet.title,
-            content=snippet.content,
-            url=snippet.url,
-            score=score,
-            tags=snippet.tags,
-            value_props=snippet.value_props,
-            discount=snippet.discount,
-            category=snippet.category,
-            metadata=snippet.metadata,
-        )
-        for score, snippet in scores
-    ]
+    if top_k is None:
+        scores.sort(key=lambda item: item[0], reverse=True)
+    else:
+        # Same order as a stable descending sort, truncated without sorting every hit.
+        scores = heapq.nlargest(top_k, scores, key=lambda item: item[0])
+    return [replace(snippet, score=score) for score, snippet in scores]
 
 
 def _load_records(path: Path) -> List[_Record]:
     records: List[_Record] = []
     if not path.exists():
         raise FileNotFoundError(f"Reference index missing at {path}")
-    with path.open("r", encoding="utf-8") as handle:
+    with path.open("rb") as handle:
         for line in handle:
             line = line.strip()
             if not line:
                 continue
-            payload = json.loads(line)
+            payload = fieldos_json.loads(line)
             tags = list(payload.get("tags") or [])
             value_props = list(payload.get("value_props") or [])
             discount = payload.get("discount")
@@ -222,43 +349,138 @@ def _load_records(path: Path) -> List[_Record]:
                 category=category or "general",
                 metadata=metadata if isinstance(metadata, dict) else {},
             )
-            vector = payload.get("vector")
-            vector_list = list(vector) if isinstance(vector, list) else None
+            vector_list = _decode_vector(payload)
             combined_text = " ".join([snippet.content] + tags + value_props)
             tokens = _tokenise(combined_text)
+            bigrams = _bigrams(tokens)
             records.append(
                 _Record(
                     id=payload["id"],
                     vector=vector_list,
                     snippet=snippet,
                     tokens=tokens,
-                    bigrams=_bigrams(tokens),
-                    norm=math.sqrt(sum(v * v for v in vector_list)) if vector_list else 0.0,
+                    bigrams=bigrams,
+                    norm=math.hypot(*vector_list) if vector_list else 0.0,
+                    token_counts=Counter(tokens),
+                    bigram_counts=Counter(bigrams),
+                    tags_lower=tuple(tag.lower() for tag in tags),
+                    value_props_lower=tuple(prop.lower() for prop in value_props),
                 )
             )
     return records
 
 
+def _decode_vector(payload: Dict[str, Any]) -> Optional[List[float]]:
+    """Return a record's embedding from a JSON list or a base64 float16/int8 buffer."""
+    vector = payload.get("vector")
+    if isinstance(vector, list):
+        # The decoded list is not shared with anything else, so it is kept rather than copied.
+        return vector
+    try:
+        encoded = payload.get("vector_f16_b64")
+        if isinstance(encoded, str):
+            return np.frombuffer(base64.b64decode(encoded), dtype="<f2").astype(np.float32).tolist()
+        encoded = payload.get("vector_i8_b64")
+        if isinstance(encoded, str):
+            scale = float(payload.get("vector_scale") or 0.0)
+            return (np.frombuffer(base64.b64decode(encoded), dtype=np.int8).astype(np.float32) * scale).tolist()
+    except (TypeError, ValueError) as exc:
+        LOGGER.warning("Ignoring undecodable vector for reference %s: %s", payload.get("id"), exc)
+    return None
+
+
+def _cache_enabled() -> bool:
+    return os.getenv("FIELDOS_CHAT_INDEX_CACHE", "true").lower() != "false"
+
+
+def _cache_paths(path: Path) -> Tuple[Path, Path]:
+    stem = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()
+    return INDEX_CACHE_DIR / f"{stem}.pkl", INDEX_CACHE_DIR / f"{stem}.npy"
+
+
+def _source_key(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_index_cache(path: Path) -> Optional[Tuple[List[_Record], List[int], np.ndarray]]:
+    """Return cached records and their unit matrix if they match ``path`` as it is now."""
+    meta_path, matrix_path = _cache_paths(path)
+    try:
+        with meta_path.open("rb") as handle:
+            meta = pickle.load(handle)
+        if meta.get("version") != _INDEX_CACHE_VERSION or meta.get("source") != _source_key(path):
+            return None
+        matrix = np.load(matrix_path, mmap_mode="r")
+        records, rows = meta["records"], meta["rows"]
+    except (OSError, EOFError, KeyError, TypeError, ValueError, AttributeError, pickle.UnpicklingError):
+        return None
+    if matrix.shape[0] != len(rows) or matrix.dtype != _vector_dtype():
+        return None
+    return records, rows, matrix
+
+
+def _write_index_cache(path: Path, records: List[_Record], rows: List[int], matrix: np.ndarray) -> None:
+    """Write the parsed index for ``path`` under ``INDEX_CACHE_DIR``; a read-only checkout just skips caching."""
+    meta_path, matrix_path = _cache_paths(path)
+    meta = {
+        "version": _INDEX_CACHE_VERSION,
+        "source": _source_key(path),
+        "records": records,
+        "rows": rows,
+    }
+    try:
+        INDEX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # The matrix lands first; the metadata carries the source key, so a reader
+        # never pairs new metadata with an old matrix.
+        matrix_tmp = matrix_path.with_name(f"{matrix_path.name}.{os.getpid()}.tmp")
+        with matrix_tmp.open("wb") as handle:
+            np.save(handle, matrix)
+        os.replace(matrix_tmp, matrix_path)
+        meta_tmp = meta_path.with_name(f"{meta_path.name}.{os.getpid()}.tmp")
+        with meta_tmp.open("wb") as handle:
+            pickle.dump(meta, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(meta_tmp, meta_path)
+    except OSError as exc:
+        LOGGER.debug("Reference index cache not written for %s: %s", path, exc)
+
+
 def load_index(path: Path = DEFAULT_INDEX_PATH, fallback_path: Optional[Path] = DEFAULT_STUB_PATH) -> ReferenceIndex:
     resolved_path = path if path.is_absolute() else Path(path)
     if not resolved_path.exists() and fallback_path:
         resolved_fallback = fallback_path if fallback_path.is_absolute() else Path(fallback_path)
         if resolved_fallback.exists():
             resolved_path = resolved_fallback
-    records = _load_records(resolved_path)
-    index = ReferenceIndex(records, DEFAULT_EMBED_MODEL)
+    cached = _read_index_cache(resolved_path) if _cache_enabled() else None
+    if cached is not None:
+        records, rows, matrix = cached
+        index = ReferenceIndex(records, DEFAULT_EMBED_MODEL, unit_matrix=(rows, matrix))
+    else:
+        records = _load_records(resolved_path)
+        index = ReferenceIndex(records, DEFAULT_EMBED_MODEL)
+        if _cache_enabled():
+            _write_index_cache(resolved_path, index.records, index._vector_rows, index._unit_matrix)
     global _DEFAULT_INDEX
     _DEFAULT_INDEX = index
     return index
 
 
 def _ensure_default_index() -> ReferenceIndex:
-    global _DEFAULT_INDEX
-    if _DEFAULT_INDEX is None:
-        _DEFAULT_INDEX = load_index(DEFAULT_INDEX_PATH, DEFAULT_STUB_PATH)
-    return _DEFAULT_INDEX
+    # Streamlit sessions run on separate threads; only the first caller builds the index.
+    index = _DEFAULT_INDEX
+    if index is None:
+        with _DEFAULT_INDEX_LOCK:
+            index = _DEFAULT_INDEX
+            if index is None:
+                index = load_index(DEFAULT_INDEX_PATH, DEFAULT_STUB_PATH)
+    return index
 
 
 def search(query: str, top_k: int = 4) -> List[Snippet]:
     index = _ensure_default_index()
     return index.search(query, top_k=top_k)
+
+
+def search_many(queries: Sequence[str], top_k: int = 4) -> List[List[Snippet]]:
+    index = _ensure_default_index()
+    return index.search_many(queries, top_k=top_k)
@@ -9,15 +9,22 @@ available, copies the deterministic stub index instead (tests/fixtures/...).
 from __future__ import annotations
 
 import argparse
+import base64
 import csv
+import hashlib
+import io
 import json
 import os
 import re
+import shutil
 import sys
-from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 try:
     import tiktoken  # type: ignore
@@ -25,6 +32,12 @@ except ImportError:  # pragma: no cover - optional dependency
     tiktoken = None  # type: ignore
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import fieldos_json  # noqa: E402
+from reference_search import _decode_vector  # noqa: E402
+
 DATA_DIR = ROOT / "data"
 TEST_FIXTURES = ROOT / "tests" / "fixtures"
 
@@ -35,13 +48,40 @@ SALES_PLAYBOOK_JSON = DATA_DIR / "playbooks.json"
 PRICING_JSON = DATA_DIR / "pricing.json"
 
 INDEX_PATH = DATA_DIR / "reference_index.jsonl"
+MARKDOWN_CACHE_DIR = ROOT / ".cache" / "reference_chunks"
 META_PATH = DATA_DIR / "reference_index.meta.json"
 STUB_INDEX = TEST_FIXTURES / "reference_index_stub.jsonl"
 
+# (path, source, base_url) for every markdown source, tokenised together.
+MARKDOWN_SOURCES = (
+    (COMPANY_WIKI, "wiki", "#company-wiki"),
+    (SALES_PLAYBOOK_MD, "playbook", "#sales-playbook"),
+)
+
 DEFAULT_EMBED_MODEL = os.getenv("FIELDOS_CHAT_EMBED_MODEL", "text-embedding-3-small")
 
+IO_BUFFER_SIZE = 1 << 20
+
+# "float16" and "int8" store vectors as base64 buffers (see reference_search._decode_vector);
+# "float" keeps the plain JSON list.
+VECTOR_FORMATS = ("float16", "int8", "float")
+DEFAULT_VECTOR_FORMAT = os.getenv("FIELDOS_INDEX_VECTOR_FORMAT", "float16")
+
 TOKEN_CHUNK_SIZE = 200
 TOKEN_OVERLAP = 20
+# Bump when markdown splitting or the Chunk fields change so older cache entries are ignored.
+MARKDOWN_CACHE_VERSION = 1
+# tiktoken's batch calls release the GIL and fan out across this many Rust threads.
+ENCODER_THREADS = os.cpu_count() or 1
+
+# text-embedding-3 accepts up to 2048 inputs and ~300k tokens per request; stay under both.
+EMBED_MAX_INPUTS = 2048
+EMBED_MAX_BATCH_TOKENS = 250_000
+EMBED_MAX_IN_FLIGHT = max(1, int(os.getenv("FIELDOS_EMBED_CONCURRENCY", "5")))
+
+_WS_RE = re.compile(r"\s+")
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_PERCENT_RE = re.compile(r"(\d+%)")
 
 
 def _load_openai_client():
@@ -70,7 +110,7 @@ def _load_openai_client():
 
 
 def _normalise(text: str) -> str:
-    return re.sub(r"\s+", " ", text.strip())
+    return _WS_RE.sub(" ", text.strip())
 
 
 def _tokenizer():
@@ -85,48 +125,61 @@ def _tokenizer():
 ENCODER = _tokenizer()
 
 
-def _split_tokens(tokens: Sequence[int], chunk_size: int, overlap: int) -> List[Sequence[int]]:
-    if not tokens:
+def _token_windows(length: int, chunk_size: int, overlap: int) -> List[Tuple[int, int]]:
+    """Return ``(start, end)`` bounds of overlapping windows over ``length`` tokens."""
+    if length <= 0:
         return []
-    if len(tokens) <= chunk_size:
-        return [tokens]
-    chunks: List[Sequence[int]] = []
+    if length <= chunk_size:
+        return [(0, length)]
+    windows: List[Tuple[int, int]] = []
     start = 0
-    while start < len(tokens):
-        end = min(len(tokens), start + chunk_size)
-        chunks.append(tokens[start:end])
-        if end == len(tokens):
+    while start < length:
+        end = min(length, start + chunk_size)
+        windows.append((start, end))
+        if end == length:
             break
         start = max(0, end - overlap)
-    return chunks
+    return windows
+
+
+def _chunk_texts(texts: Sequence[str]) -> List[List[str]]:
+    """Chunk each of ``texts``, encoding and decoding them all in one batch call each."""
+    cleaned = [_normalise(text) for text in texts]
+    if not ENCODER:
+        return [_chunk_words(text) if text else [] for text in cleaned]
+    results: List[List[str]] = [[] for _ in cleaned]
+    # Every token covers at least one UTF-8 byte, so a text of at most TOKEN_CHUNK_SIZE
+    # bytes is a single window that decodes back to itself; it skips the tokenizer.
+    pending: List[int] = []
+    for position, text in enumerate(cleaned):
+        if not text:
+            continue
+        if len(text.encode("utf-8")) <= TOKEN_CHUNK_SIZE:
+            results[position] = [text]
+        else:
+            pending.append(position)
+    if not pending:
+        return results
+    encoded = ENCODER.encode_batch([cleaned[position] for position in pending], num_threads=ENCODER_THREADS)
+    spans: List[Tuple[int, int, int]] = []
+    token_chunks: List[List[int]] = []
+    for position, tokens in zip(pending, encoded):
+        start = len(token_chunks)
+        # One slice per window; the slices go straight to decode_batch.
+        token_chunks.extend(tokens[lo:hi] for lo, hi in _token_windows(len(tokens), TOKEN_CHUNK_SIZE, TOKEN_OVERLAP))
+        spans.append((position, start, len(token_chunks)))
+    decoded = ENCODER.decode_batch(token_chunks, num_threads=ENCODER_THREADS)
+    for position, start, end in spans:
+        results[position] = decoded[start:end]
+    return results
 
 
-def _chunk_text(text: str) -> List[str]:
-    cleaned = _normalise(text)
-    if not cleaned:
-        return []
-    if ENCODER:
-        tokens = ENCODER.encode(cleaned)
-        segments = []
-        for token_chunk in _split_tokens(tokens, TOKEN_CHUNK_SIZE, TOKEN_OVERLAP):
-            segments.append(ENCODER.decode(list(token_chunk)))
-        return segments
+def _chunk_words(cleaned: str) -> List[str]:
     # Fallback: approximate tokens with words
     words = cleaned.split()
     approx_chunk = int(TOKEN_CHUNK_SIZE / 0.75)
     approx_overlap = int(TOKEN_OVERLAP / 0.75)
-    if len(words) <= approx_chunk:
-        return [" ".join(words)]
-    segments = []
-    start = 0
-    while start < len(words):
-        end = min(len(words), start + approx_chunk)
-        segments.append(" ".join(words[start:end]))
-        if end == len(words):
-            break
-        start = max(0, end - approx_overlap)
-    return segments
-
+    return [" ".join(words[lo:hi]) for lo, hi in _token_windows(len(words), approx_chunk, approx_overlap)]
 
 DEFAULT_VALUE_PROPS = [
     "Highlight service reliability and quick turnaround",
@@ -142,18 +195,13 @@ def _collect_service_value_props(playbook_data: Dict, pricing_data: Dict) -> Dic
         for entry in entries:
             props = entry.get("value_props")
             if isinstance(props, list) and props:
-                bucket = value_map.setdefault(service, [])
-                for prop in props:
-                    if prop not in bucket:
-                        bucket.append(prop)
+                value_map.setdefault(service, []).extend(props)
     for service, payload in pricing_data.items():
         props = payload.get("value_props")
         if isinstance(props, list) and props:
-            bucket = value_map.setdefault(service, [])
-            for prop in props:
-                if prop not in bucket:
-                    bucket.append(prop)
-    return value_map
+            value_map.setdefault(service, []).extend(props)
+    # dict.fromkeys drops repeats but keeps first-seen order.
+    return {service: list(dict.fromkeys(props)) for service, props in value_map.items()}
 
 
 def _collect_service_discounts(pricing_data: Dict) -> Dict[str, str]:
@@ -182,34 +230,34 @@ def _load_json(path: Path) -> Dict:
     if not path.exists():
         return {}
     try:
-        raw = path.read_text(encoding="utf-8")
+        raw = path.read_bytes()
     except OSError:
         return {}
     if not raw.strip():
         return {}
     try:
-        return json.loads(raw)
-    except json.JSONDecodeError:
+        return fieldos_json.loads(raw)
+    except ValueError:
         return {}
 
 
-def _chunk_markdown(path: Path, source: str, base_url: str) -> Iterable[Chunk]:
-    if not path.exists():
-        return []
+def _markdown_sections(path: Path, raw: bytes) -> List[Tuple[str, str]]:
+    """Split the markdown bytes read from ``path`` into ``(title, body)`` sections at ``##``/``###`` headings."""
     current_title = path.stem.replace("_", " ").title()
     buffer: List[str] = []
-    chunks: List[Chunk] = []
-    with path.open("r", encoding="utf-8") as handle:
+    sections: List[Tuple[str, str]] = []
+    # newline=None gives the same universal-newline lines as reading the file in text mode.
+    with io.StringIO(raw.decode("utf-8"), newline=None) as handle:
         for raw_line in handle:
             line = raw_line.strip()
             if line.startswith("### "):
                 if buffer:
-                    chunks.extend(_flush_markdown_buffer(buffer, current_title, source, base_url))
+                    sections.append((current_title, "\n".join(buffer)))
                     buffer.clear()
                 current_title = line[4:].strip()
             elif line.startswith("## "):
                 if buffer:
-                    chunks.extend(_flush_markdown_buffer(buffer, current_title, source, base_url))
+                    sections.append((current_title, "\n".join(buffer)))
                     buffer.clear()
                 current_title = line[3:].strip()
             elif line.startswith("#"):
@@ -217,61 +265,163 @@ def _chunk_markdown(path: Path, source: str, base_url: str) -> Iterable[Chunk]:
             else:
                 buffer.append(line)
     if buffer:
-        chunks.extend(_flush_markdown_buffer(buffer, current_title, source, base_url))
+        sections.append((current_title, "\n".join(buffer)))
+    return sections
+
+
+def _markdown_cache_path(raw: bytes, source: str, base_url: str) -> Path:
+    """Cache file for one markdown source, named by a hash of everything its chunks depend on."""
+    digest = hashlib.sha256()
+    settings = [
+        MARKDOWN_CACHE_VERSION,
+        source,
+        base_url,
+        "cl100k_base" if ENCODER is not None else "words",
+        TOKEN_CHUNK_SIZE,
+        TOKEN_OVERLAP,
+    ]
+    digest.update(json.dumps(settings).encode("utf-8"))
+    digest.update(raw)
+    return MARKDOWN_CACHE_DIR / f"{digest.hexdigest()}.json"
+
+
+def _read_markdown_cache(path: Path) -> Optional[List[Chunk]]:
+    try:
+        return [Chunk(**item) for item in fieldos_json.loads(path.read_bytes())]
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _write_markdown_cache(path: Path, chunks: List[Chunk]) -> None:
+    """Store ``chunks`` under ``path``; a read-only checkout just skips caching."""
+    records = [asdict(chunk) for chunk in chunks]
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(fieldos_json.dumps(records))
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        print(f"Markdown chunk cache not written: {exc}", file=sys.stderr)
+
+
+def _chunk_markdown_sources() -> Dict[str, List[Chunk]]:
+    """Chunk all markdown sources, grouped by source.
+
+    Unchanged sources load from ``MARKDOWN_CACHE_DIR``. The rest share a single tokenise/decode pass.
+    """
+    chunks: Dict[str, List[Chunk]] = {}
+    misses: Dict[str, Path] = {}
+    sections: List[Tuple[str, str, str, str]] = []
+    for path, source, base_url in MARKDOWN_SOURCES:
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            continue  # missing sources contribute no chunks
+        cache_path = _markdown_cache_path(raw, source, base_url)
+        cached = _read_markdown_cache(cache_path)
+        if cached is not None:
+            chunks[source] = cached
+            continue
+        misses[source] = cache_path
+        sections.extend((source, base_url, title, body) for title, body in _markdown_sections(path, raw))
+    segmented = _chunk_texts([body for _, _, _, body in sections])
+    fresh: Dict[str, List[Chunk]] = {}
+    for (source, base_url, title, _), segments in zip(sections, segmented):
+        fresh.setdefault(source, []).extend(_markdown_chunks(segments, title, source, base_url))
+    for source, cache_path in misses.items():
+        chunks[source] = fresh.get(source, [])
+        _write_markdown_cache(cache_path, chunks[source])
     return chunks
 
 
-def _flush_markdown_buffer(buffer: List[str], title: str, source: str, base_url: str) -> List[Chunk]:
-    text = "\n".join(buffer)
-    segments = _chunk_text(text)
-    results: List[Chunk] = []
-    for idx, segment in enumerate(segments):
-        chunk_id = f"{source}_{re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')}_{idx}"
-        results.append(
-            Chunk(
-                id=chunk_id,
-                source=source,
-                title=title,
-                content=segment,
-                url=f"{base_url}",
-                metadata={"category": "general"},
-            )
+def _markdown_chunks(segments: List[str], title: str, source: str, base_url: str) -> List[Chunk]:
+    slug = _slugify(title)
+    return [
+        Chunk(
+            id=f"{source}_{slug}_{idx}",
+            source=source,
+            title=title,
+            content=segment,
+            url=f"{base_url}",
+            metadata={"category": "general"},
         )
-    return results
+        for idx, segment in enumerate(segments)
+    ]
+
+
+# Unpacked in this order by _chunk_crm_rows.
+CRM_COLUMNS = (
+    "Customer_ID",
+    "Customer_Name",
+    "Customer_Type",
+    "Service_Interest",
+    "Primary_Contact",
+    "Contact_Phone",
+    "Contact_Email",
+    "Stage",
+    "Assigned_Rep",
+    "Region",
+    "Summary",
+    "Notes",
+)
 
 
 def _chunk_crm_rows(path: Path) -> Iterable[Chunk]:
     if not path.exists():
         return []
     chunks: List[Chunk] = []
-    with path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
+    with path.open("r", encoding="utf-8", newline="", buffering=IO_BUFFER_SIZE) as handle:
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None:
+            return chunks
+        # Resolve column positions once; a later duplicate header wins, as with DictReader.
+        positions = {column: index for index, column in enumerate(header)}
+        columns = [positions.get(column) for column in CRM_COLUMNS]
         for row in reader:
-            customer_id = _normalise(row.get("Customer_ID", "") or "")
-            name = _normalise(row.get("Customer_Name", "") or "Customer")
-            customer_type = _normalise(row.get("Customer_Type", "") or "")
-            service = _normalise(row.get("Service_Interest", "") or "")
-            contact = _normalise(row.get("Primary_Contact", "") or "primary contact")
-            phone = _normalise(row.get("Contact_Phone", "") or "")
-            email = _normalise(row.get("Contact_Email", "") or "")
-            stage = _normalise(row.get("Stage", "") or "")
-            rep = _normalise(row.get("Assigned_Rep", "") or "")
-            region = _normalise(row.get("Region", "") or "")
-            summary = _normalise(row.get("Summary", "") or row.get("Notes", "") or "")
-            if summary:
-                summary = summary[:200]
-
-            parts = [
-                f"{name} ({customer_type}) — {service}." if service else f"{name} ({customer_type}).",
-                f"Primary contact {contact}{f' ({phone})' if phone else ''}.",
-                f"Email {email}." if email else "",
-                f"Stage {stage}, rep {rep}, region {region}.",
-                f"Customer ID {customer_id}.",
+            if not row:
+                continue  # blank line; DictReader skipped these too
+            width = len(row)
+            (
+                customer_id,
+                name,
+                customer_type,
+                service,
+                contact,
+                phone,
+                email,
+                stage,
+                rep,
+                region,
                 summary,
+                notes,
+            ) = (row[index] if index is not None and index < width else "" for index in columns)
+            customer_id = _normalise(customer_id)
+            name = _normalise(name or "Customer")
+            customer_type = _normalise(customer_type)
+            service = _normalise(service)
+            contact = _normalise(contact or "primary contact")
+            phone = _normalise(phone)
+            email = _normalise(email)
+            stage = _normalise(stage)
+            rep = _normalise(rep)
+            region = _normalise(region)
+            # Truncation can leave a trailing space behind.
+            summary = _normalise(summary or notes)[:200].rstrip()
+
+            # Every field is already whitespace-collapsed, so the joined text needs no
+            # second _normalise pass; only an empty name can leave a leading space.
+            parts = [
+                (f"{name} ({customer_type}) — {service}." if service else f"{name} ({customer_type}).").lstrip(),
+                f"Primary contact {contact} ({phone})." if phone else f"Primary contact {contact}.",
             ]
-            content = _normalise(" ".join(part for part in parts if part))
-            if not content:
-                continue
+            if email:
+                parts.append(f"Email {email}.")
+            parts.append(f"Stage {stage}, rep {rep}, region {region}.")
+            parts.append(f"Customer ID {customer_id}.")
+            if summary:
+                parts.append(summary)
+            content = " ".join(parts)
             chunk_id = f"crm_{customer_id or name.lower().replace(' ', '_')}"
             metadata = {
                 "category": "general",
@@ -295,7 +445,15 @@ def _chunk_crm_rows(path: Path) -> Iterable[Chunk]:
 
 
 def _slugify(value: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+    return _SLUG_RE.sub("-", value.lower()).strip("-")
+
+
+# (keyword, value prop) pairs applied in order when a snippet mentions the keyword.
+_VALUE_PROP_RULES = (
+    ("curb", "Boost curb appeal with fresh mulch"),
+    ("weed", "Suppress weeds and retain soil moisture"),
+    ("winter", "Protect installations in winter conditions"),
+)
 
 
 def _derive_value_props(service: str, snippet: str, tags: List[str], *, curated: Optional[Dict[str, List[str]]] = None) -> List[str]:
@@ -303,22 +461,8 @@ def _derive_value_props(service: str, snippet: str, tags: List[str], *, curated:
     if curated and service in curated:
         props.extend(curated[service])
     snippet_lower = snippet.lower()
-    if "curb" in snippet_lower and "Boost curb appeal with fresh mulch" not in props:
-        props.append("Boost curb appeal with fresh mulch")
-    if "weed" in snippet_lower and "Suppress weeds and retain soil moisture" not in props:
-        props.append("Suppress weeds and retain soil moisture")
-    if "winter" in snippet_lower and "Protect installations in winter conditions" not in props:
-        props.append("Protect installations in winter conditions")
-    if not props:
-        props.extend(DEFAULT_VALUE_PROPS)
-    seen = set()
-    unique_props: List[str] = []
-    for prop in props:
-        if prop not in seen:
-            seen.add(prop)
-            unique_props.append(prop)
-    props = unique_props[:3] if unique_props else DEFAULT_VALUE_PROPS[:3]
-    return props
+    props.extend(prop for keyword, prop in _VALUE_PROP_RULES if keyword in snippet_lower)
+    return list(dict.fromkeys(props or DEFAULT_VALUE_PROPS))[:3]
 
 
 def _extract_discount(
@@ -327,7 +471,7 @@ def _extract_discount(
     *,
     overrides: Optional[Dict[str, str]] = None,
 ) -> Optional[str]:
-    match = re.search(r"(\d+%)", snippet)
+    match = _PERCENT_RE.search(snippet)
     if match:
         percent = match.group(1)
         return f"{percent} promo"
@@ -426,57 +570,184 @@ def _chunk_pricing(pricing_data: Dict) -> Iterable[Chunk]:
 
 
 def _gather_chunks() -> List[Chunk]:
+    # Markdown tokenisation (tiktoken releases the GIL) and the CRM CSV read overlap
+    # with each other and with the JSON sources handled on this thread.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        markdown_future = pool.submit(_chunk_markdown_sources)
+        crm_future = pool.submit(_chunk_crm_rows, CRM_SAMPLE)
+        pricing_data = _load_json(PRICING_JSON)
+        playbook_data = _load_json(SALES_PLAYBOOK_JSON)
+        value_props_map = _collect_service_value_props(playbook_data, pricing_data)
+        discount_map = _collect_service_discounts(pricing_data)
+        playbook_chunks = _chunk_playbook_entries(playbook_data, pricing_data, value_props_map, discount_map)
+        pricing_chunks = _chunk_pricing(pricing_data)
+        markdown_chunks = markdown_future.result()
+        crm_chunks = crm_future.result()
     chunks: List[Chunk] = []
-    pricing_data = _load_json(PRICING_JSON)
-    playbook_data = _load_json(SALES_PLAYBOOK_JSON)
-    value_props_map = _collect_service_value_props(playbook_data, pricing_data)
-    discount_map = _collect_service_discounts(pricing_data)
-    chunks.extend(_chunk_markdown(COMPANY_WIKI, "wiki", "#company-wiki"))
-    chunks.extend(_chunk_crm_rows(CRM_SAMPLE))
-    if SALES_PLAYBOOK_MD.exists():
-        chunks.extend(_chunk_markdown(SALES_PLAYBOOK_MD, "playbook", "#sales-playbook"))
-    chunks.extend(_chunk_playbook_entries(playbook_data, pricing_data, value_props_map, discount_map))
-    chunks.extend(_chunk_pricing(pricing_data))
+    chunks.extend(markdown_chunks.get("wiki", []))
+    chunks.extend(crm_chunks)
+    chunks.extend(markdown_chunks.get("playbook", []))
+    chunks.extend(playbook_chunks)
+    chunks.extend(pricing_chunks)
     return chunks
 
 
-def _embed_chunks(chunks: List[Chunk], model: str) -> Optional[List[List[float]]]:
+def _token_counts(texts: Sequence[str]) -> List[int]:
+    if ENCODER:
+        return [len(tokens) for tokens in ENCODER.encode_batch(list(texts), num_threads=ENCODER_THREADS)]
+    # Same words-to-tokens approximation _chunk_words uses without tiktoken.
+    return [int(len(text.split()) / 0.75) + 1 for text in texts]
+
+
+def _pack_batches(texts: Sequence[str]) -> List[List[str]]:
+    """Greedily group ``texts`` into as few requests as the input and token caps allow."""
+    batches: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for text, count in zip(texts, _token_counts(texts)):
+        if current and (len(current) >= EMBED_MAX_INPUTS or current_tokens + count > EMBED_MAX_BATCH_TOKENS):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += count
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _embed_chunks(chunks: List[Chunk], model: str) -> Optional[Iterator[Tuple[List[Chunk], List[List[float]]]]]:
+    """Return a stream of ``(chunk_slice, vectors)`` pairs in chunk order, or None without a client."""
     client = _load_openai_client()
     if client is None:
         return None
     texts = [chunk.content for chunk in chunks]
-    embeddings: List[List[float]] = []
-    # Batch requests to avoid payload limits (max 2048 tokens per chunk).
-    batch_size = 64
-    for start in range(0, len(texts), batch_size):
-        batch = texts[start : start + batch_size]
-        response = client.embeddings.create(model=model, input=batch)
-        for item in response.data:
-            embeddings.append(list(item.embedding))  # type: ignore[attr-defined]
-    return embeddings
-
-
-def _write_index(chunks: List[Chunk], vectors: List[List[float]]) -> None:
+    batches = _pack_batches(texts)
+    offsets = [0]
+    for batch in batches:
+        offsets.append(offsets[-1] + len(batch))
+
+    def _embed_batch(batch: List[str]) -> List[List[float]]:
+        # The client retries 429s/5xx with backoff on its own, per batch.
+        try:
+            response = client.embeddings.create(model=model, input=batch)
+        except Exception as exc:
+            # A 400 usually means the estimate undershot the request limits; halve and retry.
+            if getattr(exc, "status_code", None) != 400 or len(batch) == 1:
+                raise
+            middle = len(batch) // 2
+            return _embed_batch(batch[:middle]) + _embed_batch(batch[middle:])
+        return [list(item.embedding) for item in response.data]  # type: ignore[attr-defined]
+
+    def _stream() -> Iterator[Tuple[List[Chunk], List[List[float]]]]:
+        # Requests are network-bound, so a few run at once on the shared client;
+        # map() yields results in submission order, keeping vectors aligned with chunks.
+        with ThreadPoolExecutor(max_workers=min(EMBED_MAX_IN_FLIGHT, len(batches) or 1)) as pool:
+            for start, end, vectors in zip(offsets, offsets[1:], pool.map(_embed_batch, batches)):
+                yield chunks[start:end], vectors
+
+    return _stream()
+
+
+def _ordered_vectors(
+    keys: List[str],
+    vectors: Dict[str, List[float]],
+    batches: Optional[Iterator[Tuple[List[Chunk], List[List[float]]]]],
+) -> Iterator[List[float]]:
+    """Yield the vector for each key in order, pulling embedded batches only once a key needs them."""
+    pending = batches if batches is not None else iter(())
+    for key in keys:
+        while key not in vectors:
+            chunk_slice, batch_vectors = next(pending)
+            for chunk, vector in zip(chunk_slice, batch_vectors):
+                vectors[_content_key(chunk.content)] = vector
+        yield vectors[key]
+
+
+def _encode_vector(vector: List[float], vector_format: str) -> Dict[str, object]:
+    """Return the record fields holding ``vector`` in ``vector_format``."""
+    if vector_format == "float16":
+        packed = np.asarray(vector, dtype="<f2").tobytes()
+        return {"vector_f16_b64": base64.b64encode(packed).decode("ascii")}
+    if vector_format == "int8":
+        values = np.asarray(vector, dtype=np.float32)
+        peak = float(np.abs(values).max()) if values.size else 0.0
+        scale = peak / 127.0
+        quantised = np.round(values / scale) if scale else np.zeros_like(values)
+        packed = quantised.astype(np.int8).tobytes()
+        return {"vector_i8_b64": base64.b64encode(packed).decode("ascii"), "vector_scale": scale}
+    return {"vector": vector}
+
+
+def _content_key(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _load_cached_vectors(model: str, vector_format: str) -> Dict[str, List[float]]:
+    """Map content hashes to vectors in the existing index, if it was built with the same model and format.
+
+    The format has to match too, so an int8 index is never re-encoded as if it were full precision.
+    """
+    meta = _load_json(META_PATH)
+    if meta.get("model") != model or meta.get("vector_format", "float") != vector_format:
+        return {}
+    cached: Dict[str, List[float]] = {}
+    try:
+        with INDEX_PATH.open("rb") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                payload = fieldos_json.loads(line)
+                content = payload.get("content")
+                vector = _decode_vector(payload)
+                if isinstance(content, str) and vector:
+                    cached[_content_key(content)] = vector
+    except (OSError, ValueError) as exc:
+        print(f"Ignoring existing index for reuse: {exc}", file=sys.stderr)
+        return {}
+    return cached
+
+
+def _write_index(
+    chunks: List[Chunk],
+    vectors: Iterable[List[float]],
+    vector_format: str = DEFAULT_VECTOR_FORMAT,
+    model: str = DEFAULT_EMBED_MODEL,
+) -> None:
+    """Write one record per chunk as its vector arrives.
+
+    ``vectors`` may be a lazy stream. Records go to a ``.partial`` file that replaces the
+    index only once every chunk is written; if writing fails, the partial file is removed
+    and the old index is left intact.
+    """
     INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with INDEX_PATH.open("w", encoding="utf-8") as handle:
-        for chunk, vector in zip(chunks, vectors):
-            record = {
-                "id": chunk.id,
-                "vector": vector,
-                "source": chunk.source,
-                "title": chunk.title,
-                "content": chunk.content,
-                "url": chunk.url,
-                "tags": chunk.tags,
-                "value_props": chunk.value_props,
-                "discount": chunk.discount,
-                "metadata": chunk.metadata,
-            }
-            handle.write(json.dumps(record) + "\n")
+    partial_path = INDEX_PATH.with_name(INDEX_PATH.name + ".partial")
+    try:
+        with partial_path.open("wb", buffering=IO_BUFFER_SIZE) as handle:
+            for chunk, vector in zip(chunks, vectors):
+                record = {
+                    "id": chunk.id,
+                    **_encode_vector(vector, vector_format),
+                    "source": chunk.source,
+                    "title": chunk.title,
+                    "content": chunk.content,
+                    "url": chunk.url,
+                    "tags": chunk.tags,
+                    "value_props": chunk.value_props,
+                    "discount": chunk.discount,
+                    "metadata": chunk.metadata,
+                }
+                handle.write(fieldos_json.dumps_line(record))
+    except BaseException:
+        # data/ is not git-ignored, so never leave a half-written index behind.
+        partial_path.unlink(missing_ok=True)
+        raise
+    os.replace(partial_path, INDEX_PATH)
     meta = {
         "built_at": datetime.now(timezone.utc).isoformat(),
-        "model": DEFAULT_EMBED_MODEL,
+        "model": model,
         "doc_count": len(chunks),
+        "vector_format": vector_format,
     }
     with META_PATH.open("w", encoding="utf-8") as handle:
         json.dump(meta, handle, indent=2)
@@ -484,9 +755,10 @@ def _write_index(chunks: List[Chunk], vectors: List[List[float]]) -> None:
 
 def _copy_stub_index() -> None:
     INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
-    stub_text = STUB_INDEX.read_text(encoding="utf-8")
-    INDEX_PATH.write_text(stub_text, encoding="utf-8")
-    doc_count = len([line for line in stub_text.splitlines() if line.strip()])
+    # Byte-for-byte copy; the stub is never decoded to text.
+    shutil.copyfile(STUB_INDEX, INDEX_PATH)
+    with INDEX_PATH.open("rb") as handle:
+        doc_count = sum(1 for line in handle if line.strip())
     META_PATH.write_text(
         json.dumps(
             {
@@ -505,6 +777,13 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Build FieldOS reference search index.")
     parser.add_argument("--model", default=DEFAULT_EMBED_MODEL, help="Embedding model (default text-embedding-3-small)")
     parser.add_argument("--use-stub", action="store_true", help="Force using the deterministic stub index.")
+    parser.add_argument(
+        "--vector-format",
+        choices=VECTOR_FORMATS,
+        default=DEFAULT_VECTOR_FORMAT,
+        help="On-disk embedding encoding (default float16; int8 is smaller, float keeps full precision)",
+    )
+    parser.add_argument("--full-rebuild", action="store_true", help="Re-embed every chunk instead of reusing unchanged ones.")
     args = parser.parse_args(argv)
 
     if args.use_stub or os.getenv("FIELDOS_CHAT_USE_STUB", "").lower() == "true":
@@ -517,13 +796,23 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         _copy_stub_index()
         return 0
 
-    embeddings = _embed_chunks(chunks, args.model)
-    if embeddings is None:
-        _copy_stub_index()
-        return 0
-
-    _write_index(chunks, embeddings)
-    print(f"Wrote {len(chunks)} chunks to {INDEX_PATH} using model {args.model}.")
+    keys = [_content_key(chunk.content) for chunk in chunks]
+    vectors = {} if args.full_rebuild else _load_cached_vectors(args.model, args.vector_format)
+    # Embed each changed text once, even when several chunks share it.
+    misses = list({key: chunk for key, chunk in zip(keys, chunks) if key not in vectors}.values())
+    batches = None
+    if misses:
+        batches = _embed_chunks(misses, args.model)
+        if batches is None:
+            _copy_stub_index()
+            return 0
+
+    # Records are written as their batch lands rather than after the whole corpus is embedded.
+    _write_index(chunks, _ordered_vectors(keys, vectors, batches), args.vector_format, args.model)
+    print(
+        f"Wrote {len(chunks)} chunks to {INDEX_PATH} using model {args.model} "
+        f"({len(misses)} embedded, {len(chunks) - len(misses)} reused)."
+    )
     return 0
 
 
@@ -11,11 +11,16 @@ while clearing last_payload and recent_payloads.
 
 from __future__ import annotations
 
-import json
 import sys
 from pathlib import Path
 from typing import Any, Dict
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import fieldos_json  # noqa: E402
+
 SNAPSHOT_PATH = Path("data/crm_snapshot.json")
 
 
@@ -24,9 +29,9 @@ def main() -> int:
         print("crm_snapshot.json not found; nothing to scrub.")
         return 0
     try:
-        raw = SNAPSHOT_PATH.read_text(encoding="utf-8")
-        snapshot: Dict[str, Any] = json.loads(raw) if raw.strip() else {}
-    except (OSError, json.JSONDecodeError) as exc:
+        raw = SNAPSHOT_PATH.read_bytes()
+        snapshot: Dict[str, Any] = fieldos_json.loads(raw) if raw.strip() else {}
+    except (OSError, ValueError) as exc:
         print(f"Failed to load snapshot: {exc}", file=sys.stderr)
         return 1
 
@@ -51,7 +56,7 @@ def main() -> int:
         return 0
 
     try:
-        SNAPSHOT_PATH.write_text(json.dumps(snapshot, indent=2), encoding="utf-8")
+        SNAPSHOT_PATH.write_bytes(fieldos_json.dump_snapshot(snapshot))
     except OSError as exc:  # pragma: no cover - defensive guard
         print(f"Failed to write snapshot: {exc}", file=sys.stderr)
         return 1
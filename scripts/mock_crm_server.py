@@ -14,12 +14,23 @@ from __future__ import annotations
 
 import argparse
 import json
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import ClassVar
 
 
 class _MockCRMHandler(BaseHTTPRequestHandler):
     failures_remaining: ClassVar[int] = 0
+    # Requests are served on separate threads; the failure budget is shared.
+    _failures_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def _take_failure(cls) -> bool:
+        with cls._failures_lock:
+            if cls.failures_remaining > 0:
+                cls.failures_remaining -= 1
+                return True
+        return False
 
     def do_POST(self) -> None:  # noqa: N802 (handler API)
         if self.path != "/crm/push":
@@ -33,8 +44,7 @@ class _MockCRMHandler(BaseHTTPRequestHandler):
         except json.JSONDecodeError:
             body = None
 
-        if _MockCRMHandler.failures_remaining > 0:
-            _MockCRMHandler.failures_remaining -= 1
+        if self._take_failure():
             self.send_response(503)
             self.send_header("Content-Type", "application/json")
             self.end_headers()
@@ -52,6 +62,11 @@ class _MockCRMHandler(BaseHTTPRequestHandler):
         return  # Silence default logging
 
 
+class _MockCRMServer(ThreadingHTTPServer):
+    # socketserver's default listen backlog of 5 resets bursts of concurrent clients.
+    request_queue_size = 128
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Mock CRM server")
     parser.add_argument("--host", default="127.0.0.1")
@@ -60,7 +75,7 @@ def main() -> None:
     args = parser.parse_args()
 
     _MockCRMHandler.failures_remaining = max(0, args.failures)
-    server = HTTPServer((args.host, args.port), _MockCRMHandler)
+    server = _MockCRMServer((args.host, args.port), _MockCRMHandler)
     print(f"Mock CRM server listening on http://{args.host}:{args.port} (failures remaining: {args.failures})")
     try:
         server.serve_forever()
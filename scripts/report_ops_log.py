@@ -3,29 +3,35 @@
 
 from __future__ import annotations
 
-import json
+import sys
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
-from statistics import mean
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import fieldos_json  # noqa: E402
 
 OPS_LOG_PATH = Path("data/ops_log.jsonl")
 QUEUE_WARN_THRESHOLD = 3
 
 
-def _load_entries() -> List[dict]:
+def _iter_entries() -> Iterator[dict]:
+    """Yield ops log entries one line at a time, skipping blank or malformed lines."""
     if not OPS_LOG_PATH.exists():
-        return []
-    entries = []
-    for line in OPS_LOG_PATH.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            entries.append(json.loads(line))
-        except json.JSONDecodeError:
-            continue
-    return entries
+        return
+    with OPS_LOG_PATH.open("rb") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield fieldos_json.loads(line)
+            except ValueError:
+                continue
 
 
 def _parse_ts(value: Optional[str]) -> Optional[datetime]:
@@ -49,23 +55,48 @@ def _fmt_ts(value: Optional[str]) -> str:
     return local_dt.strftime("%Y-%m-%d %H:%M:%S %Z")
 
 
-def _format_markdown(entries: List[dict]) -> str:
-    if not entries:
+def _format_markdown(entries: Iterable[dict]) -> str:
+    entry_count = 0
+    latest: Optional[dict] = None
+    queue_recent: deque[int] = deque(maxlen=5)
+    latency_total = 0.0
+    latency_count = 0
+    updates_total = 0.0
+    updates_count = 0
+    total_dropouts = 0
+    total_success = 0
+    crm_entries = 0
+    crm_success_count = 0
+    latest_crm_error: Optional[str] = None
+    # One pass over the log instead of a separate generator per metric; only the
+    # last few queue depths are kept, so a streamed log is never held in memory.
+    for e in entries:
+        entry_count += 1
+        latest = e
+        queue_recent.append(int(e.get("final_worker_queue_depth") or 0))
+        latency = e.get("stream_latency_ms_first_partial")
+        if latency is not None:
+            latency_total += latency
+            latency_count += 1
+        updates = e.get("stream_updates")
+        if isinstance(updates, (int, float)):
+            updates_total += updates
+            updates_count += 1
+        total_dropouts += int(e.get("stream_dropouts") or 0)
+        if not e.get("final_worker_error"):
+            total_success += 1
+        crm_error = e.get("crm_error")
+        if e.get("crm_response_code") is not None:
+            crm_entries += 1
+            if not crm_error and e.get("status") == "synced":
+                crm_success_count += 1
+        if crm_error:
+            latest_crm_error = crm_error
+    if latest is None:
         return "No ops log entries found."
-
-    latency_values = [e["stream_latency_ms_first_partial"] for e in entries if e.get("stream_latency_ms_first_partial") is not None]
-    updates_values = [e.get("stream_updates") for e in entries if isinstance(e.get("stream_updates"), (int, float))]
-    total_dropouts = sum(int(e.get("stream_dropouts") or 0) for e in entries)
-    total_success = sum(1 for e in entries if not e.get("final_worker_error"))
-    success_rate = (total_success / len(entries)) * 100 if entries else 0.0
-    crm_entries = [e for e in entries if e.get("crm_response_code") is not None]
-    crm_success_count = sum(1 for e in crm_entries if not e.get("crm_error") and (e.get("status") == "synced"))
-    crm_success_rate = (crm_success_count / len(crm_entries)) * 100 if crm_entries else 0.0
-    latest_crm_error_entry = next((e for e in reversed(entries) if e.get("crm_error")), None)
-    latest_crm_error = latest_crm_error_entry.get("crm_error") if latest_crm_error_entry else None
-    queue_recent = [int(e.get("final_worker_queue_depth") or 0) for e in entries[-5:]]
+    success_rate = (total_success / entry_count) * 100
+    crm_success_rate = (crm_success_count / crm_entries) * 100 if crm_entries else 0.0
     queue_trend_delta = queue_recent[-1] - queue_recent[0] if len(queue_recent) >= 2 else 0
-    latest = entries[-1]
     latest_queue = int(latest.get("final_worker_queue_depth") or 0)
     latest_error = latest.get("final_worker_error")
     latest_success = latest.get("final_worker_last_success")
@@ -77,8 +108,8 @@ def _format_markdown(entries: List[dict]) -> str:
     latest_chat_identifier = latest.get("chat_last_hash") or latest.get("chat_last_query") or "—"
     latest_chat_positioning = int(latest.get("chat_positioning_count") or 0)
 
-    def _avg(values: List[Optional[float]]) -> str:
-        return f"{mean(values):.1f}" if values else "—"
+    def _avg(total: float, count: int) -> str:
+        return f"{total / count:.1f}" if count else "—"
 
     warnings: List[str] = []
     if latest_queue > QUEUE_WARN_THRESHOLD:
@@ -101,9 +132,9 @@ def _format_markdown(entries: List[dict]) -> str:
         "",
         "| Metric | Value |",
         "| --- | --- |",
-        f"| Entries | {len(entries)} |",
-        f"| Avg first partial (ms) | {_avg(latency_values)} |",
-        f"| Avg streaming updates | {_avg(updates_values)} |",
+        f"| Entries | {entry_count} |",
+        f"| Avg first partial (ms) | {_avg(latency_total, latency_count)} |",
+        f"| Avg streaming updates | {_avg(updates_total, updates_count)} |",
         f"| Total dropouts | {total_dropouts} |",
         f"| AI failures (latest) | {latest.get('ai_failures', 0)} |",
         f"| Last event | {latest.get('ts', '—')} ({latest.get('status', 'unknown')}) |",
@@ -129,7 +160,7 @@ def _format_markdown(entries: List[dict]) -> str:
 
 
 def main() -> None:
-    summary = _format_markdown(_load_entries())
+    summary = _format_markdown(_iter_entries())
     print(summary)
 
 
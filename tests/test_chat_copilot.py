@@ -24,6 +24,7 @@ def test_copilot_stub_response(monkeypatch):
     monkeypatch.setenv("FIELDOS_CHAT_INDEX_PATH", str(FIXTURES / "reference_index_stub.jsonl"))
     monkeypatch.setenv("FIELDOS_CHAT_INDEX_STUB_PATH", str(FIXTURES / "reference_index_stub.jsonl"))
     monkeypatch.setenv("FIELDOS_CHAT_STUB_PATH", str(FIXTURES / "chat_stub.json"))
+    monkeypatch.setenv("FIELDOS_CHAT_INDEX_CACHE", "false")
 
     app = AppTest.from_file("app.py")
     app.run()
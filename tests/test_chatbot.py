@@ -13,6 +13,7 @@ def setup_module(module):
     os.environ["FIELDOS_CHAT_INDEX_PATH"] = str(FIXTURES / "reference_index_stub.jsonl")
     os.environ["FIELDOS_CHAT_INDEX_STUB_PATH"] = str(FIXTURES / "reference_index_stub.jsonl")
     os.environ["FIELDOS_CHAT_STUB_PATH"] = str(FIXTURES / "chat_stub.json")
+    os.environ["FIELDOS_CHAT_INDEX_CACHE"] = "false"
 
 
 def test_build_prompt_contains_snippet_context():
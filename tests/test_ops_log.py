@@ -7,6 +7,7 @@ from typing import Any, Dict
 from unittest import mock
 
 import crm_sync
+import ops_dashboard
 import scripts.report_ops_log as report_ops
 
 
@@ -18,6 +19,7 @@ class OpsLogTests(unittest.TestCase):
         self.patchers = [
             mock.patch.object(crm_sync, "OPS_LOG_PATH", self.ops_path),
             mock.patch.object(report_ops, "OPS_LOG_PATH", self.ops_path),
+            mock.patch.object(ops_dashboard, "OPS_LOG_PATH", self.ops_path),
         ]
         for patcher in self.patchers:
             patcher.start()
@@ -130,6 +132,52 @@ class OpsLogTests(unittest.TestCase):
         self.assertIn("Latest CRM error", summary)
         self.assertIn("Copilot positioning briefs", summary)
 
+    def test_ops_dashboard_streams_summary(self) -> None:
+        self.ops_path.write_text(
+            "\n".join(
+                [
+                    json.dumps({"status": "synced", "stream_latency_ms_first_partial": 300, "stream_updates": 2, "final_worker_queue_depth": 1, "crm_response_code": 200}),
+                    "",
+                    "not json",
+                    json.dumps({"status": "failed", "stream_latency_ms_first_partial": None, "stream_dropouts": 1, "final_worker_queue_depth": 4, "final_worker_error": "timeout", "crm_response_code": 503, "crm_error": "mock failure"}),
+                ]
+            ),
+            encoding="utf-8",
+        )
+
+        summary = ops_dashboard.summarize_ops(ops_dashboard.iter_ops_entries())
+
+        self.assertEqual(summary.entries, 2)
+        self.assertEqual((summary.latency_total, summary.latency_count), (300, 1))
+        self.assertEqual(summary.total_dropouts, 1)
+        self.assertEqual(summary.total_success, 1)
+        self.assertEqual((summary.crm_entries, summary.crm_success, summary.crm_errors), (2, 1, 1))
+        self.assertEqual(summary.latest_crm_error, "mock failure")
+        self.assertEqual(list(summary.queue_recent), [1, 4])
+        self.assertEqual(summary.latest["status"], "failed")
+
+    def test_ops_dashboard_refresh_reads_only_appended_lines(self) -> None:
+        self.ops_path.write_text(json.dumps({"status": "synced", "stream_latency_ms_first_partial": 300}) + "\n", encoding="utf-8")
+        summary = ops_dashboard.refresh_ops_summary(ops_dashboard.OpsSummary())
+        self.assertEqual(summary.entries, 1)
+
+        with self.ops_path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps({"status": "synced", "stream_latency_ms_first_partial": 500}) + "\n")
+            handle.write('{"status": "partial"')
+        summary = ops_dashboard.refresh_ops_summary(summary)
+        self.assertEqual(summary.entries, 2)
+        self.assertEqual((summary.latency_total, summary.latency_count), (800, 2))
+
+        with self.ops_path.open("a", encoding="utf-8") as handle:
+            handle.write("}\n")
+        summary = ops_dashboard.refresh_ops_summary(summary)
+        self.assertEqual(summary.entries, 3)
+        self.assertEqual(summary.latest["status"], "partial")
+
+        self.ops_path.write_text(json.dumps({"status": "failed"}) + "\n", encoding="utf-8")
+        summary = ops_dashboard.refresh_ops_summary(summary)
+        self.assertEqual(summary.entries, 1)
+
 
 if __name__ == "__main__":
     unittest.main()
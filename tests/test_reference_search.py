@@ -2,6 +2,9 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
 
 import reference_search
 
@@ -11,6 +14,7 @@ FIXTURES = Path(__file__).resolve().parents[0] / "fixtures"
 def setup_module(module):
     os.environ["FIELDOS_CHAT_INDEX_PATH"] = str(FIXTURES / "reference_index_stub.jsonl")
     os.environ["FIELDOS_CHAT_INDEX_STUB_PATH"] = str(FIXTURES / "reference_index_stub.jsonl")
+    os.environ["FIELDOS_CHAT_INDEX_CACHE"] = "false"
     # ensure fallback mode reset
     if "FIELDOS_CHAT_FALLBACK_MODE" in os.environ:
         del os.environ["FIELDOS_CHAT_FALLBACK_MODE"]
@@ -47,3 +51,111 @@ def test_keyword_fallback_mode_stub():
     assert results, "Expected results in stub fallback"
     assert any(r.title == "Acme HOA Summary" for r in results)
     os.environ["FIELDOS_CHAT_FALLBACK_MODE"] = ""
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("float32", 1e-5), ("float16", 2e-3)])
+def test_vector_search_matches_cosine_ranking(monkeypatch, dtype, tolerance):
+    monkeypatch.delenv("FIELDOS_CHAT_FALLBACK_MODE", raising=False)
+    monkeypatch.setenv("FIELDOS_CHAT_VECTOR_DTYPE", dtype)
+    index = reference_search.load_index(FIXTURES / "reference_index_stub.jsonl")
+    query_vector = [0.1, 0.3, 0.9, 0.4]
+    monkeypatch.setattr(index, "_embed_queries", lambda queries: [tuple(query_vector)] * len(queries))
+
+    def cosine(vector):
+        dot = sum(q * v for q, v in zip(query_vector, vector))
+        norm_q = sum(q * q for q in query_vector) ** 0.5
+        norm_v = sum(v * v for v in vector) ** 0.5
+        return dot / (norm_q * norm_v)
+
+    expected = sorted(
+        (record for record in index.records if record.vector),
+        key=lambda record: cosine(record.vector),
+        reverse=True,
+    )[:3]
+    results = index.search("mulch upsell", top_k=3)
+    assert [snippet.title for snippet in results] == [record.snippet.title for record in expected]
+    for snippet, record in zip(results, expected):
+        assert abs(snippet.score - cosine(record.vector)) < tolerance
+
+
+def test_load_index_reuses_cache_until_source_changes(tmp_path, monkeypatch):
+    monkeypatch.delenv("FIELDOS_CHAT_INDEX_CACHE", raising=False)
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(reference_search, "INDEX_CACHE_DIR", cache_dir)
+    source = tmp_path / "index.jsonl"
+    source.write_text((FIXTURES / "reference_index_stub.jsonl").read_text(encoding="utf-8"), encoding="utf-8")
+
+    first = reference_search.load_index(source, fallback_path=None)
+    assert sorted(path.suffix for path in cache_dir.iterdir()) == [".npy", ".pkl"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["cache", "index.jsonl"], "Cache written beside the index"
+
+    parsed = []
+    original_load = reference_search._load_records
+    monkeypatch.setattr(reference_search, "_load_records", lambda path: parsed.append(path) or original_load(path))
+    cached = reference_search.load_index(source, fallback_path=None)
+    assert not parsed, "Unchanged index should load from the cache"
+    assert [r.snippet.title for r in cached.records] == [r.snippet.title for r in first.records]
+    assert cached._unit_matrix.shape == first._unit_matrix.shape
+
+    with source.open("a", encoding="utf-8") as handle:
+        handle.write("\n")
+    reference_search.load_index(source, fallback_path=None)
+    assert parsed == [source], "Modified index should be re-parsed"
+
+
+@pytest.mark.parametrize("vector_format, tolerance", [("float", 0.0), ("float16", 1e-3), ("int8", 1e-2)])
+def test_index_vectors_round_trip_through_writer_encoding(tmp_path, monkeypatch, vector_format, tolerance):
+    import scripts.build_reference_index as builder
+
+    monkeypatch.setattr(builder, "INDEX_PATH", tmp_path / "index.jsonl")
+    monkeypatch.setattr(builder, "META_PATH", tmp_path / "index.meta.json")
+    chunks = [builder.Chunk(id=f"c{i}", source="wiki", title=f"T{i}", content="mulch promo", url="#") for i in range(3)]
+    vectors = [[0.8, -0.1, 0.5, 0.1], [0.0, 0.0, 0.0, 0.0], [-0.25, 0.75, 0.3, -0.6]]
+    builder._write_index(chunks, vectors, vector_format)
+
+    records = reference_search._load_records(tmp_path / "index.jsonl")
+    for record, expected in zip(records, vectors):
+        assert record.vector == pytest.approx(expected, abs=tolerance)
+    assert records[1].norm == 0.0
+
+
+def test_failed_index_write_keeps_old_index_and_drops_partial_file(tmp_path, monkeypatch):
+    import scripts.build_reference_index as builder
+
+    index_path = tmp_path / "index.jsonl"
+    monkeypatch.setattr(builder, "INDEX_PATH", index_path)
+    monkeypatch.setattr(builder, "META_PATH", tmp_path / "index.meta.json")
+    index_path.write_bytes(b'{"id": "old"}\n')
+    chunks = [builder.Chunk(id=f"c{i}", source="wiki", title=f"T{i}", content="mulch promo", url="#") for i in range(3)]
+
+    def _vectors():
+        yield [0.1, 0.2]
+        raise RuntimeError("embedding request failed")
+
+    with pytest.raises(RuntimeError):
+        builder._write_index(chunks, _vectors(), "float")
+
+    assert index_path.read_bytes() == b'{"id": "old"}\n'
+    assert not list(tmp_path.glob("*.partial"))
+
+
+def test_search_many_embeds_uncached_queries_in_one_request(monkeypatch):
+    monkeypatch.delenv("FIELDOS_CHAT_FALLBACK_MODE", raising=False)
+    monkeypatch.setattr(reference_search, "_EMBED_CACHE", reference_search.OrderedDict())
+    index = reference_search.load_index(FIXTURES / "reference_index_stub.jsonl")
+    requests = []
+
+    class _Embeddings:
+        def create(self, model, input):
+            requests.append(list(input))
+            data = [SimpleNamespace(embedding=[0.8, 0.1, 0.5, 0.1]) for _ in input]
+            return SimpleNamespace(data=data)
+
+    index._client = SimpleNamespace(embeddings=_Embeddings())
+    results = index.search_many(["mulch promo", "acme status", "mulch promo", "  "], top_k=2)
+    assert requests == [["mulch promo", "acme status"]]
+    assert [len(hits) for hits in results] == [2, 2, 2, 0]
+    assert results[0][0].title == results[2][0].title
+
+    index.search("acme status", top_k=2)
+    assert len(requests) == 1, "Cached query embeddings should not be re-requested"